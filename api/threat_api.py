@@ -2,28 +2,41 @@
 API роутеры для работы с оценками угроз астероидов.
 """
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from .dependencies import get_threat_service
-from domains.threat import ThreatAssessmentResponse, ThreatService
+from domains.threat import ThreatAssessmentResponse, ThreatAssessmentPage, ThreatService
+from domains.threat.services.threat_service import MAX_LIMIT
 
 router = APIRouter(prefix="/threats", tags=["Threats"])
 
+IMPACT_CATEGORIES = ("локальный", "региональный", "глобальный")
+
 
 @router.get("/current")
 async def get_current_threats(
-    skip: int = Query(0),
-    limit: Optional[int] = Query(),
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(ge=0, le=MAX_LIMIT),
     min_ts: int = Query(default=1, description="Минимальная Туринская шкала"),
     threat_service: ThreatService = Depends(get_threat_service)
 ) -> List[ThreatAssessmentResponse]:
     """Получить актуальные угрозы. Возвращает список объектов с ненулевым риском, отсортированных по степени опасности"""
     return await threat_service.get_by_risk_level(min_ts, 10, skip, limit)
 
+@router.get("/current/page")
+async def get_current_threats_page(
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(ge=0, le=MAX_LIMIT),
+    min_ts: int = Query(default=1, description="Минимальная Туринская шкала"),
+    threat_service: ThreatService = Depends(get_threat_service)
+) -> ThreatAssessmentPage:
+    """Страница актуальных угроз вместе с общим количеством, одним запросом к БД"""
+    return await threat_service.get_by_risk_level_page(min_ts, 10, skip, limit)
+
 @router.get("/high-risk")
 async def get_high_risk_threats(
-    limit: Optional[int] = Query(),
-    skip: int = Query(),
+    limit: Optional[int] = Query(ge=0, le=MAX_LIMIT),
+    skip: int = Query(ge=0),
     threat_service: ThreatService = Depends(get_threat_service)
 ) -> List[ThreatAssessmentResponse]:
     """Получить угрозы высокого риска. Возвращает угрозы с Туринской шкалой >= 5"""
@@ -31,8 +44,8 @@ async def get_high_risk_threats(
 
 @router.get("/by-probability")
 async def get_threats_by_probability(
-    skip: int = Query(),
-    limit: Optional[int] = Query(),
+    skip: int = Query(ge=0),
+    limit: Optional[int] = Query(ge=0, le=MAX_LIMIT),
     min_probability: float = Query(),
     max_probability: float = Query(),
     threat_service: ThreatService = Depends(get_threat_service)
@@ -40,10 +53,21 @@ async def get_threats_by_probability(
     """Получить угрозы по диапазону вероятности столкновения"""
     return await threat_service.get_by_probability(min_probability, max_probability, skip, limit)
 
+@router.get("/by-probability/page")
+async def get_threats_by_probability_page(
+    skip: int = Query(ge=0),
+    limit: Optional[int] = Query(ge=0, le=MAX_LIMIT),
+    min_probability: float = Query(),
+    max_probability: float = Query(),
+    threat_service: ThreatService = Depends(get_threat_service)
+) -> ThreatAssessmentPage:
+    """Страница угроз по диапазону вероятности столкновения вместе с общим количеством"""
+    return await threat_service.get_by_probability_page(min_probability, max_probability, skip, limit)
+
 @router.get("/by-energy")
 async def get_threats_by_energy(
-    skip: int = Query(),
-    limit: Optional[int] = Query(),
+    skip: int = Query(ge=0),
+    limit: Optional[int] = Query(ge=0, le=MAX_LIMIT),
     min_energy: float = Query(),
     max_energy: Optional[float] = Query(),
     threat_service: ThreatService = Depends(get_threat_service)
@@ -51,6 +75,33 @@ async def get_threats_by_energy(
     """Получить угрозы по диапазону энергии воздействия. Энергия измеряется в мегатоннах (Мт)"""
     return await threat_service.get_by_energy(min_energy, max_energy, skip, limit)
 
+@router.get("/by-energy/page")
+async def get_threats_by_energy_page(
+    skip: int = Query(ge=0),
+    limit: Optional[int] = Query(ge=0, le=MAX_LIMIT),
+    min_energy: float = Query(),
+    max_energy: Optional[float] = Query(),
+    threat_service: ThreatService = Depends(get_threat_service)
+) -> ThreatAssessmentPage:
+    """Страница угроз по диапазону энергии воздействия вместе с общим количеством"""
+    return await threat_service.get_by_energy_page(min_energy, max_energy, skip, limit)
+
+@router.get("/by-categories")
+async def get_threats_by_categories(
+    categories: List[str] = Query(description="Категории воздействия"),
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(ge=0, le=MAX_LIMIT),
+    threat_service: ThreatService = Depends(get_threat_service)
+) -> Dict[str, List[ThreatAssessmentResponse]]:
+    """Получить угрозы сразу по нескольким категориям воздействия одним запросом, сгруппированные по категории"""
+    unknown = [category for category in categories if category not in IMPACT_CATEGORIES]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid category: {', '.join(unknown)}. Supported: {', '.join(IMPACT_CATEGORIES)}"
+        )
+    return await threat_service.get_by_categories(categories, skip, limit)
+
 @router.get("/statistics")
 async def get_threat_statistics(threat_service: ThreatService = Depends(get_threat_service)) -> dict:
     """Получить статистику по угрозам. Возвращает общую статистику: количество угроз, распределение по уровням риска"""
@@ -67,14 +118,29 @@ async def get_threat_by_designation(
 @router.get("/by-category/{category}")
 async def get_threats_by_category(
     category: str,
-    skip: int = Query(0),
-    limit: Optional[int] = Query(),
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(ge=0, le=MAX_LIMIT),
     threat_service: ThreatService = Depends(get_threat_service)
 ) -> List[ThreatAssessmentResponse]:
     """Получить угрозы по категории воздействия. Категории: локальный, региональный, глобальный"""
-    if category not in ["локальный", "региональный", "глобальный"]:
+    if category not in IMPACT_CATEGORIES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid category: {category}. Supported: локальный, региональный, глобальный"
+            detail=f"Invalid category: {category}. Supported: {', '.join(IMPACT_CATEGORIES)}"
         )
     return await threat_service.get_by_category(category, skip, limit)
+
+@router.get("/by-category/{category}/page")
+async def get_threats_by_category_page(
+    category: str,
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(ge=0, le=MAX_LIMIT),
+    threat_service: ThreatService = Depends(get_threat_service)
+) -> ThreatAssessmentPage:
+    """Страница угроз по категории воздействия вместе с общим количеством"""
+    if category not in IMPACT_CATEGORIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid category: {category}. Supported: {', '.join(IMPACT_CATEGORIES)}"
+        )
+    return await threat_service.get_by_category_page(category, skip, limit)
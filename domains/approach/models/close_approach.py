@@ -11,7 +11,7 @@ class CloseApproachModel(Base):
     asteroid_id: Mapped[int] = mapped_column(
         ForeignKey('asteroid_models.id', ondelete='CASCADE'),
         nullable=False,
-        index=True,
+        # Отдельный индекс не нужен: asteroid_id - ведущая колонка uq_asteroid_approach_time
         comment="Ссылка на астероид"
     )
 
@@ -5,7 +5,6 @@ import logging
 
 from shared.infrastructure.services.base_service import BaseService
 from domains.approach import CloseApproachModel
-from shared.transaction.uow import UnitOfWork
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +17,7 @@ class ApproachService(BaseService):
 
     async def get_upcoming(self, limit: Optional[int] = None, skip: int = 0) -> List[Dict[str, Any]]:
         """Получение ближайших сближений астероидов с Землей"""
-        async with UnitOfWork(self.session_factory) as uow:
+        async with self._acquire_uow() as uow:
             approaches = await uow.approach_repo.get_upcoming_approaches(limit, skip)
             return [self._model_to_dict(a) for a in approaches]
 
@@ -28,13 +27,13 @@ class ApproachService(BaseService):
 
     async def get_closest(self, limit: Optional[int] = None, skip: int = 0) -> List[Dict[str, Any]]:
         """Получение самых близких по расстоянию сближений"""
-        async with UnitOfWork(self.session_factory) as uow:
+        async with self._acquire_uow() as uow:
             approaches = await uow.approach_repo.get_closest_approaches_by_distance(limit, skip)
             return [self._model_to_dict(a) for a in approaches]
 
     async def get_fastest(self, limit: Optional[int] = None, skip: int = 0) -> List[Dict[str, Any]]:
         """Получение сближений с наибольшей скоростью"""
-        async with UnitOfWork(self.session_factory) as uow:
+        async with self._acquire_uow() as uow:
             approaches = await uow.approach_repo.get_fastest_approaches(limit, skip)
             return [self._model_to_dict(a) for a in approaches]
 
@@ -44,22 +43,27 @@ class ApproachService(BaseService):
 
     async def get_by_asteroid_designation(self, designation: str, skip: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Получение всех сближений для астероида по его обозначению NASA"""
-        async with UnitOfWork(self.session_factory) as uow:
+        async with self._acquire_uow() as uow:
             approaches = await uow.approach_repo.get_by_asteroid_designation(designation, skip, limit)
             return [self._model_to_dict(a) for a in approaches]
 
     async def get_approaches_in_period(self, start_date: datetime, end_date: datetime, max_distance: Optional[float] = None, skip: int = 0, limit: Optional[int] = 100) -> List[Dict[str, Any]]:
         """Получение сближений в указанном временном периоде"""
-        async with UnitOfWork(self.session_factory) as uow:
+        async with self._acquire_uow() as uow:
             approaches = await uow.approach_repo.get_approaches_in_period(start_date, end_date, max_distance, skip, limit)
             return [self._model_to_dict(a) for a in approaches]
 
     async def get_statistics(self) -> Dict[str, Any]:
         """Возвращает статистику по сближениям астероидов с Землей"""
-        async with UnitOfWork(self.session_factory) as uow:
+        async with self._acquire_uow() as uow:
             return await uow.approach_repo.get_statistics()
 
+    async def bulk_create_approaches(self, approaches_data: List[Dict[str, Any]], calculation_batch_id: str) -> int:
+        """Массовое создание/обновление сближений одной партии расчета"""
+        async with self._acquire_uow() as uow:
+            return await uow.approach_repo.bulk_create_approaches(approaches_data, calculation_batch_id)
+
     async def delete_old_approaches(self, cutoff_date: datetime) -> int:
         """Удаляет старые сближения (которые уже произошли)"""
-        async with UnitOfWork(self.session_factory) as uow:
+        async with self._acquire_uow() as uow:
             return await uow.approach_repo.delete_old_approaches(cutoff_date)
@@ -1,12 +1,16 @@
 import logging
-from sqlalchemy import CheckConstraint, Float, String, Boolean, UniqueConstraint
+import numpy as np
+from sqlalchemy import CheckConstraint, Float, Index, String, Boolean, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from shared.models.base import Base
 
 logger = logging.getLogger(__name__)
 
+# Допустимые значения diameter_source (совпадают с check_diameter_source)
+DIAMETER_SOURCES = frozenset({'measured', 'computed', 'calculated'})
+
 class AsteroidModel(Base):
     """Модель для хранения данных о потенциально опасных астероидах (PHA). Соответствует таблице 'asteroid_models'"""
     # Основные идентификаторы
@@ -81,21 +85,29 @@ class AsteroidModel(Base):
     )
     
     # Связи с другими таблицами
+    # Сближения и оценка угрозы не загружаются вместе с астероидом: списки астероидов их не используют,
+    # а детальный ответ запрашивает их отдельно. Удаление выполняет ON DELETE CASCADE в БД
     close_approaches: Mapped[List['CloseApproachModel']] = relationship( # type: ignore
         back_populates='asteroid',
         cascade='all, delete-orphan',
-        lazy='selectin',
+        lazy='raise',
+        passive_deletes=True,
         order_by='CloseApproachModel.approach_time'
     )
     threat_assessment: Mapped[Optional['ThreatAssessmentModel']] = relationship( # type: ignore
         back_populates='asteroid',
         cascade='all, delete-orphan',
-        lazy='selectin',
+        lazy='raise',
+        passive_deletes=True,
         uselist=False
     )
     
     __table_args__ = (
         UniqueConstraint('designation', name='uq_asteroid_designation'),
+        # Индексы под постраничные выборки: по MOID с сортировкой по MOID, по классу орбиты с сортировкой по обозначению.
+        # Частичные индексы не подходят: в таблице только PHA (MOID <= 0.05), а класс орбиты всегда заполнен
+        Index('ix_asteroid_models_earth_moid_au', 'earth_moid_au'),
+        Index('ix_asteroid_models_orbit_class_designation', 'orbit_class', 'designation'),
         CheckConstraint(
             "aphelion_au IS NULL OR perihelion_au IS NULL OR aphelion_au > perihelion_au",
             name='check_aphelion_gt_perihelion'
@@ -120,58 +132,102 @@ class AsteroidModel(Base):
     
     def __init__(self, **kwargs):
         """Инициализирует экземпляр модели астероида с валидацией данных"""
-        super().__init__(**kwargs)
+        super().__init__(**self.normalize_data(kwargs))
+
+    @classmethod
+    def normalize_data(cls, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Возвращает копию данных астероида с проверенными альбедо, источником диаметра, диаметром и H.
+        Используется и конструктором, и массовой вставкой, которая конструктор не вызывает"""
+        data = dict(data)
+        designation = data.get('designation')
 
         # валидация альбедо
-        if self.albedo is None:
+        albedo = data.get('albedo')
+        if albedo is None:
             # Значение не было передано - используем по умолчанию
-            self.albedo = 0.15
-            logger.debug(f"Albedo not provided for {self.designation}, using default 0.15")
-        elif isinstance(self.albedo, (int, float)):
-            # Значение передано как число - проверяем диапазон
-            self.albedo = float(self.albedo)
-            if not (0 < self.albedo <= 1):
-                logger.warning(f"Albedo {self.albedo} out of range (0,1] for {self.designation}, using 0.15")
-                self.albedo = 0.15
+            albedo = 0.15
+            logger.debug(f"Albedo not provided for {designation}, using default 0.15")
         else:
-            # Пытаемся преобразовать строку или другой тип
             try:
-                self.albedo = float(self.albedo)
-                if not (0 < self.albedo <= 1):
-                    logger.warning(f"Albedo {self.albedo} out of range for {self.designation}, using 0.15")
-                    self.albedo = 0.15
+                albedo = float(albedo)
+                if not (0 < albedo <= 1):
+                    logger.warning(f"Albedo {albedo} out of range (0,1] for {designation}, using 0.15")
+                    albedo = 0.15
             except (ValueError, TypeError):
-                logger.warning(f"Cannot convert albedo '{self.albedo}' to float for {self.designation}, using 0.15")
-                self.albedo = 0.15
+                logger.warning(f"Cannot convert albedo '{albedo}' to float for {designation}, using 0.15")
+                albedo = 0.15
+        data['albedo'] = albedo
 
         # валидация diameter_source
-        valid_sources = {'measured', 'computed', 'calculated'}
-        if self.diameter_source not in valid_sources:
-            logger.warning(f"Invalid diameter_source '{self.diameter_source}' for {self.designation}, using 'calculated'")
-            self.diameter_source = 'calculated'
+        if data.get('diameter_source') not in DIAMETER_SOURCES:
+            logger.warning(f"Invalid diameter_source '{data.get('diameter_source')}' for {designation}, using 'calculated'")
+            data['diameter_source'] = 'calculated'
 
         # Диаметр
-        if not hasattr(self, 'estimated_diameter_km') or self.estimated_diameter_km is None:
-            self.estimated_diameter_km = 0.05
+        diameter = data.get('estimated_diameter_km')
+        if diameter is None:
+            diameter = 0.05
         else:
             try:
-                self.estimated_diameter_km = float(self.estimated_diameter_km)
-                if self.estimated_diameter_km <= 0:
-                    logger.warning(f"Invalid diameter {self.estimated_diameter_km} for {self.designation}, using 0.05")
-                    self.estimated_diameter_km = 0.05
+                diameter = float(diameter)
+                if diameter <= 0:
+                    logger.warning(f"Invalid diameter {diameter} for {designation}, using 0.05")
+                    diameter = 0.05
             except (TypeError, ValueError):
-                logger.warning(f"Cannot convert diameter '{self.estimated_diameter_km}' to float for {self.designation}, using 0.05")
-                self.estimated_diameter_km = 0.05
-        
+                logger.warning(f"Cannot convert diameter '{diameter}' to float for {designation}, using 0.05")
+                diameter = 0.05
+        data['estimated_diameter_km'] = diameter
+
         # Абсолютная величина
-        if not hasattr(self, 'absolute_magnitude') or self.absolute_magnitude is None:
-            self.absolute_magnitude = 18.0
+        magnitude = data.get('absolute_magnitude')
+        if magnitude is None:
+            magnitude = 18.0
         else:
             try:
-                self.absolute_magnitude = float(self.absolute_magnitude)
+                magnitude = float(magnitude)
             except (TypeError, ValueError):
-                logger.warning(f"Cannot convert absolute_magnitude '{self.absolute_magnitude}' for {self.designation}, using 18.0")
-                self.absolute_magnitude = 18.0
+                logger.warning(f"Cannot convert absolute_magnitude '{magnitude}' for {designation}, using 18.0")
+                magnitude = 18.0
+        data['absolute_magnitude'] = magnitude
+
+        return data
+
+    @classmethod
+    def normalize_batch(cls, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Пакетная версия normalize_data: альбедо, диаметр и H проверяются одним проходом NumPy.
+        Если среди значений есть не приводимые к числу, используется построчная normalize_data"""
+        try:
+            albedo = np.asarray([r.get('albedo') for r in records], dtype=np.float64)
+            diameter = np.asarray([r.get('estimated_diameter_km') for r in records], dtype=np.float64)
+            magnitude = np.asarray([r.get('absolute_magnitude') for r in records], dtype=np.float64)
+        except (ValueError, TypeError):
+            return [cls.normalize_data(r) for r in records]
+
+        # NaN (значение не передано) не проходит сравнения и тоже заменяется значением по умолчанию
+        bad_albedo = ~((albedo > 0) & (albedo <= 1))
+        bad_diameter = ~(diameter > 0)
+        invalid_albedo = int((bad_albedo & ~np.isnan(albedo)).sum())
+        invalid_diameter = int((bad_diameter & ~np.isnan(diameter)).sum())
+        if invalid_albedo:
+            logger.warning(f"Albedo out of range (0,1] for {invalid_albedo} asteroids, using 0.15")
+        if invalid_diameter:
+            logger.warning(f"Invalid diameter for {invalid_diameter} asteroids, using 0.05")
+
+        albedo = np.where(bad_albedo, 0.15, albedo).tolist()
+        diameter = np.where(bad_diameter, 0.05, diameter).tolist()
+        magnitude = np.where(np.isnan(magnitude), 18.0, magnitude).tolist()
+
+        result = []
+        for record, albedo_value, diameter_value, magnitude_value in zip(records, albedo, diameter, magnitude):
+            data = dict(record)
+            data['albedo'] = albedo_value
+            data['estimated_diameter_km'] = diameter_value
+            data['absolute_magnitude'] = magnitude_value
+            if data.get('diameter_source') not in DIAMETER_SOURCES:
+                logger.warning(f"Invalid diameter_source '{data.get('diameter_source')}' for {data.get('designation')}, using 'calculated'")
+                data['diameter_source'] = 'calculated'
+            result.append(data)
+        return result
     
     def __repr__(self) -> str:
         return f"AsteroidModel(id={self.id}, designation={self.designation}, name={self.name})"
\ No newline at end of file
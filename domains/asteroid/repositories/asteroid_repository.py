@@ -37,6 +37,7 @@ class AsteroidRepository(BaseRepository[AsteroidModel]):
             result = await self.session.execute(query)
             return result.scalar() or 0
         except Exception as e:
+            await self._rollback(e)
             logger.error(f"Ошибка получения количества астероидов: {e}")
             return 0
 
@@ -110,17 +111,22 @@ class AsteroidRepository(BaseRepository[AsteroidModel]):
         created, updated = await self.bulk_create(asteroids_data, "update", ["designation"])
         return created, updated
 
+    async def bulk_create_asteroids(self, asteroids_data: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """Массовое создание/обновление астероидов: один INSERT ... ON CONFLICT (designation) на пачку"""
+        rows = AsteroidModel.normalize_batch(asteroids_data)
+        return await self.bulk_create(rows, "update", ["designation"])
+
     async def delete_asteroids_not_in_designations(self, designations: List[str]) -> int:
         """Удаляет астероиды, которых нет в списке designations"""
         try:
             from sqlalchemy import delete
             query = delete(self.model).where(self.model.designation.notin_(designations))
             result = await self.session.execute(query)
-            await self.session.commit()
+            await self._commit()
             deleted_count = result.rowcount
             logger.info(f"Удалено {deleted_count} астероидов, которых нет в списке NASA")
             return deleted_count
         except Exception as e:
-            await self.session.rollback()
+            await self._rollback(e)
             logger.error(f"Ошибка удаления астероидов: {e}")
             return 0
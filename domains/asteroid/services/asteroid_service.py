@@ -1,10 +1,9 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
 import logging
 
 from shared.infrastructure.services.base_service import BaseService
 from domains.asteroid import AsteroidModel, AsteroidRepository
-from shared.transaction.uow import UnitOfWork
 
 logger = logging.getLogger(__name__)
 
@@ -17,13 +16,13 @@ class AsteroidService(BaseService):
 
     async def get_by_designation(self, designation: str) -> Optional[Dict[str, Any]]:
         """Получение астероида по обозначению NASA"""
-        async with UnitOfWork(self.session_factory) as uow:
+        async with self._acquire_uow() as uow:
             asteroid = await uow.asteroid_repo.get_by_designation(designation)
             return self._model_to_dict(asteroid) if asteroid else None
 
     async def get_by_moid(self, max_moid: float = 0.05, skip: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Получение астероидов с MOID меньше указанного"""
-        async with UnitOfWork(self.session_factory) as uow:
+        async with self._acquire_uow() as uow:
             asteroids = await uow.asteroid_repo.get_asteroids_by_earth_moid(max_moid, skip, limit)
             return [self._model_to_dict(a) for a in asteroids]
 
@@ -33,7 +32,7 @@ class AsteroidService(BaseService):
 
     async def get_count(self, max_moid: float = 1.0) -> int:
         """Получение общего количества астероидов с MOID меньше указанного"""
-        async with UnitOfWork(self.session_factory) as uow:
+        async with self._acquire_uow() as uow:
             return await uow.asteroid_repo.get_asteroids_count(max_moid)
 
     async def get_by_orbit_class(self, orbit_class: str, skip: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
@@ -46,10 +45,15 @@ class AsteroidService(BaseService):
 
     async def get_statistics(self) -> Dict[str, Any]:
         """Возвращает статистику по астероидам"""
-        async with UnitOfWork(self.session_factory) as uow:
+        async with self._acquire_uow() as uow:
             return await uow.asteroid_repo.get_statistics()
 
+    async def bulk_create_asteroids(self, asteroids_data: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """Массовое создание/обновление астероидов"""
+        async with self._acquire_uow() as uow:
+            return await uow.asteroid_repo.bulk_create_asteroids(asteroids_data)
+
     async def delete_asteroids_not_in_designations(self, designations: List[str]) -> int:
         """Удаляет астероиды, которых нет в списке NASA"""
-        async with UnitOfWork(self.session_factory) as uow:
+        async with self._acquire_uow() as uow:
             return await uow.asteroid_repo.delete_asteroids_not_in_designations(designations)
@@ -1,5 +1,5 @@
 from .models import ThreatAssessmentModel
-from .schemas import ThreatAssessmentBase, ThreatAssessmentResponse
+from .schemas import ThreatAssessmentBase, ThreatAssessmentResponse, ThreatAssessmentPage
 from .repositories import ThreatRepository
 from .services import ThreatService
 
@@ -7,6 +7,7 @@ __all__ = [
     'ThreatAssessmentModel',
     'ThreatAssessmentBase',
     'ThreatAssessmentResponse',
+    'ThreatAssessmentPage',
     'ThreatRepository',
     'ThreatService',
 ]
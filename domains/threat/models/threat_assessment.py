@@ -1,12 +1,20 @@
 from sqlalchemy import Float, String, ForeignKey, CheckConstraint, Integer, JSON, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime, timezone
-from typing import List
+from typing import List, Optional
 import logging
+import math
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
 from shared.models.base import Base
+from shared.utils.torino import THREAT_LEVEL_BY_TORINO
+
+# E[Мт] = 0.5 * m * v² / 4.184e15 при плотности 2000 кг/м³: m = 2000 * (4/3)π(500·d)³, v = 1000·v_inf.
+# Все множители свернуты в одну константу: E = _ENERGY_K * d³ * v_inf² (d в км, v_inf в км/с)
+_ENERGY_K = 0.5 * 2000 * (4/3) * math.pi * 500 ** 3 * 1000 ** 2 / 4.184e15
+
 
 class ThreatAssessmentModel(Base):
     """Модель для хранения оценок угроз столкновений из NASA Sentry API. Соответствует таблице 'threat_assessment_models'"""
@@ -138,9 +146,11 @@ class ThreatAssessmentModel(Base):
     )
     
     # Связи
+    # Many-to-one по обязательному FK: астероид подгружается INNER JOIN в том же запросе, без второго SELECT
     asteroid: Mapped['AsteroidModel'] = relationship( # type: ignore
         back_populates='threat_assessment',  
-        lazy='selectin'
+        lazy='joined',
+        innerjoin=True
     )
     
     # Ограничения на уровне таблицы
@@ -203,6 +213,9 @@ class ThreatAssessmentModel(Base):
             calculated_energy = self._calculate_energy()
             if calculated_energy > 0:
                 self.energy_megatons = calculated_energy
+        # Для очень малых тел энергия округляется до нуля; None сломал бы определение категории
+        if self.energy_megatons is None:
+            self.energy_megatons = 0.0
         
         # Автоматическое определение категории воздействия
         if not hasattr(self, 'impact_category') or not self.impact_category:
@@ -212,66 +225,57 @@ class ThreatAssessmentModel(Base):
         if not hasattr(self, 'threat_level_ru') or not self.threat_level_ru:
             self.threat_level_ru = self._assess_threat_level()
     
+    @staticmethod
+    def calculate_energy_batch(diameter_km: np.ndarray, velocity_km_s: np.ndarray) -> np.ndarray:
+        """Энергия удара в мегатоннах для массивов диаметров и скоростей.
+        Неположительный или отсутствующий (NaN) диаметр и отсутствующая скорость дают 0.0"""
+        energy_megatons = _ENERGY_K * diameter_km ** 3 * velocity_km_s ** 2
+        energy_megatons = np.where((diameter_km > 0) & np.isfinite(energy_megatons), energy_megatons, 0.0)
+        return np.round(energy_megatons, 2)
+
     def _calculate_energy(self) -> float:
-        """Расчет энергии удара в мегатоннах тротила"""
+        """Расчет энергии удара в мегатоннах тротила (та же формула, что и для пачки)"""
         try:
-            diameter_km = getattr(self, 'diameter', 0.05) # Используем поля с правильными именами
-            velocity_km_s = getattr(self, 'v_inf', 20.0)
-            
-            if diameter_km <= 0:
-                return 0.0
-                
-            diameter_m = diameter_km * 1000
-            radius_m = diameter_m / 2
-            
-            # Объем в м³
-            volume_m3 = (4/3) * 3.14159 * (radius_m ** 3)
-            
-            # Масса в кг (плотность ~2000 кг/м³ для каменных астероидов)
-            mass_kg = volume_m3 * 2000
-            
-            # Энергия в джоулях
-            energy_joules = 0.5 * mass_kg * (velocity_km_s * 1000) ** 2
-            
-            # Конвертация в мегатонны тротила
-            energy_megatons = energy_joules / 4.184e15
-            
-            return round(energy_megatons, 2)
-            
-        except (TypeError, ValueError, AttributeError, OverflowError) as e:
+            energy = self.calculate_energy_batch(
+                np.array([self.diameter], dtype=np.float64),
+                np.array([self.v_inf], dtype=np.float64)
+            )
+            return float(energy[0])
+        except (TypeError, ValueError) as e:
             logger.error(f"Error calculating energy for {self.designation}: {e}")
             return 0.0
     
+    @staticmethod
+    def impact_category_batch(energy_megatons: np.ndarray) -> np.ndarray:
+        """Категории воздействия для массива энергий: меньше 1 Мт - локальный, меньше 100 Мт - региональный"""
+        return np.select(
+            [energy_megatons < 1, energy_megatons < 100],
+            ['локальный', 'региональный'],
+            'глобальный'
+        )
+
     def _determine_impact_category(self) -> str:
         """Определение категории воздействия на основе энергии"""
-        energy = getattr(self, 'energy_megatons', 0.0)
-        
-        if energy < 1:
-            return 'локальный'
-        elif energy < 100:
-            return 'региональный'
-        else:
-            return 'глобальный'
+        return str(self.impact_category_batch(np.array([self.energy_megatons], dtype=np.float64))[0])
     
     def _assess_threat_level(self) -> str:
         """Оценка уровня угрозы на основе шкал Турина и Палермо"""
-        ts_max = getattr(self, 'ts_max', 0)
-        ps_max = getattr(self, 'ps_max', -10.0)
-        
+        return self.assess_threat_level(self.ts_max, self.ps_max)
+
+    @staticmethod
+    def assess_threat_level(ts_max: Optional[int], ps_max: Optional[float]) -> str:
+        """Уровень угрозы по значениям шкал Турина и Палермо"""
+        ts_max = 0 if ts_max is None else ts_max
+        ps_max = -10.0 if ps_max is None else ps_max
+
         if ts_max == 0:
             if ps_max < -2:
                 return "НУЛЕВОЙ (ниже фонового уровня)"
             else:
                 return "ОЧЕНЬ НИЗКИЙ"
-        elif 1 <= ts_max <= 4:
-            return "НИЗКИЙ (требует наблюдения)"
-        elif ts_max == 5:
-            return "СРЕДНИЙ (заслуживает внимания астрономов)"
-        elif ts_max == 6:
-            return "ПОВЫШЕННЫЙ (серьёзная угроза)"
-        elif ts_max == 7:
-            return "ВЫСОКИЙ (очень серьёзная угроза)"
-        elif ts_max >= 8:
+        elif 1 <= ts_max < len(THREAT_LEVEL_BY_TORINO):
+            return THREAT_LEVEL_BY_TORINO[ts_max]
+        elif ts_max >= len(THREAT_LEVEL_BY_TORINO):
             return "КРИТИЧЕСКИЙ (непосредственная угроза)"
         else:
             return "НЕ ОПРЕДЕЛЕН"
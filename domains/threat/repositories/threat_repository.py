@@ -1,8 +1,10 @@
 from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, delete
+from sqlalchemy import select, func, delete, bindparam
+from sqlalchemy.orm import joinedload
 from datetime import datetime
 import logging
+import numpy as np
 
 from domains.threat import ThreatAssessmentModel
 from shared.infrastructure import BaseRepository
@@ -10,21 +12,44 @@ from shared.infrastructure import BaseRepository
 logger = logging.getLogger(__name__)
 
 
+def _threat_load_options() -> list:
+    """Астероид подгружается одним JOIN, обращение к его связям запрещено"""
+    return [joinedload(ThreatAssessmentModel.asteroid).raiseload('*')]
+
+
 class ThreatRepository(BaseRepository[ThreatAssessmentModel]):
     """Репозиторий для операций с оценками угроз (One-to-One)"""
 
+    # Запросы точечного поиска строятся один раз; репозиторий создаётся на каждый UnitOfWork
+    _by_designation_stmt = (
+        select(ThreatAssessmentModel)
+        .options(*_threat_load_options())
+        .where(ThreatAssessmentModel.designation == bindparam("designation"))
+    )
+    _by_asteroid_id_stmt = (
+        select(ThreatAssessmentModel)
+        .options(*_threat_load_options())
+        .where(ThreatAssessmentModel.asteroid_id == bindparam("asteroid_id"))
+    )
+
     def __init__(self):
         """Инициализирует репозиторий для модели ThreatAssessmentModel"""
         super().__init__(ThreatAssessmentModel)
         logger.info("Инициализирован ThreatRepository (One-to-One)")
 
+    def _load_options(self) -> list:
+        """Опции загрузки связей для всех запросов репозитория"""
+        return _threat_load_options()
+
     async def get_by_designation(self, designation: str) -> Optional[ThreatAssessmentModel]:
         """Получает оценку угрозы по обозначению астероида"""
-        return await self._find_by_fields({"designation": designation})
+        result = await self.session.execute(self._by_designation_stmt, {"designation": designation})
+        return result.scalar_one_or_none()
 
     async def get_by_asteroid_id(self, asteroid_id: int) -> Optional[ThreatAssessmentModel]:
         """Получает оценку угрозы для конкретного астероида (One-to-One)"""
-        return await self._find_by_fields({"asteroid_id": asteroid_id})
+        result = await self.session.execute(self._by_asteroid_id_stmt, {"asteroid_id": asteroid_id})
+        return result.scalar_one_or_none()
 
     async def get_high_risk_threats(self, limit: Optional[int] = None, skip: int = 0) -> List[ThreatAssessmentModel]:
         """Получает угрозы с высоким уровнем риска (ts_max >= 5)"""
@@ -51,96 +76,85 @@ class ThreatRepository(BaseRepository[ThreatAssessmentModel]):
         """Получает угрозы по категории воздействия"""
         return await self.filter({"impact_category": category}, skip, limit, order_by="energy_megatons", order_desc=True)
 
+    async def get_threats_by_impact_categories(self, categories: List[str], skip: int = 0, limit: Optional[int] = None) -> List[ThreatAssessmentModel]:
+        """Получает угрозы сразу для нескольких категорий одним запросом, упорядоченные по категории"""
+        query = (
+            select(self.model)
+            .options(*self._load_options())
+            .where(self.model.impact_category.in_(categories))
+            .order_by(self.model.impact_category, self.model.energy_megatons.desc(), self.model.id)
+            .offset(skip)
+        )
+        if limit:
+            query = query.limit(limit)
+
+        result = await self.session.execute(query)
+        return result.scalars().all()
+
     async def bulk_create_threats(self, threats_data: List[Dict[str, Any]]) -> Tuple[int, int]:
-        """Массовое создание оценок угроз (One-to-One)"""
-        created, updated = await self.bulk_create(threats_data, "update", ["asteroid_id"])
-        return created, updated
+        """Массовое создание/обновление оценок угроз: один INSERT ... ON CONFLICT на пачку (One-to-One)"""
+        rows = [{k: v for k, v in data.items() if k in self._model_columns} for data in threats_data]
+
+        # Поля, которые модель вычисляет в __init__, считаются сразу для всей пачки без создания ORM-объектов.
+        # Как и в модели, пересчитывается только непереданная или нулевая энергия и пустые категория и уровень
+        provided = np.array([row.get('energy_megatons') or 0.0 for row in rows], dtype=np.float64)
+        computed = ThreatAssessmentModel.calculate_energy_batch(
+            np.array([row.get('diameter') for row in rows], dtype=np.float64),
+            np.array([row.get('v_inf') for row in rows], dtype=np.float64)
+        )
+        energies = np.where(provided != 0, provided, computed)
+        categories = ThreatAssessmentModel.impact_category_batch(energies)
+
+        for row, energy, category in zip(rows, energies.tolist(), categories.tolist()):
+            row['energy_megatons'] = energy
+            if not row.get('impact_category'):
+                row['impact_category'] = category
+            if not row.get('threat_level_ru'):
+                row['threat_level_ru'] = ThreatAssessmentModel.assess_threat_level(row.get('ts_max'), row.get('ps_max'))
+
+        return await self.bulk_create(rows, "update", ["asteroid_id"])
 
     async def get_statistics(self) -> Dict[str, Any]:
-        """Возвращает статистику по оценкам угроз"""
+        """Возвращает статистику по оценкам угроз (все агрегаты одним запросом)"""
         try:
-            total = await self.count()
-
-            ts_stats = {}
-            for ts in range(0, 11):
-                ts_query = select(func.count()).where(self.model.ts_max == ts)
-                ts_result = await self.session.execute(ts_query)
-                ts_scalar = ts_result.scalar()
-                if hasattr(ts_scalar, '__await__'):
-                    count = await ts_scalar
-                else:
-                    count = ts_scalar
+            ts_values = range(0, 11)
+            categories = ['локальный', 'региональный', 'глобальный']
+
+            query = select(
+                func.count().label("total"),
+                *[func.count().filter(self.model.ts_max == ts).label(f"ts_{ts}") for ts in ts_values],
+                *[func.count().filter(self.model.impact_category == category) for category in categories],
+                func.avg(self.model.ip),
+                func.max(self.model.energy_megatons),
+                func.avg(self.model.energy_megatons),
+                func.count().filter(self.model.ip > 0),
+                func.count().filter(self.model.ts_max >= 5),
+            ).select_from(self.model)
+
+            row = (await self.session.execute(query)).one()
+            values = iter(row)
+
+            total = next(values) or 0
+
+            def distribution_entry(count):
                 count_val = count or 0
                 percent = round((count_val / total * 100) if total > 0 else 0, 1)
-                ts_stats[f"ts_{ts}"] = {'count': count_val, 'percent': percent}
-
-            category_stats = {}
-            for category in ['локальный', 'региональный', 'глобальный']:
-                cat_query = select(func.count()).where(self.model.impact_category == category)
-                cat_result = await self.session.execute(cat_query)
-                cat_scalar = cat_result.scalar()
-                if hasattr(cat_scalar, '__await__'):
-                    count = await cat_scalar
-                else:
-                    count = cat_scalar
-                count_val = count or 0
-                percent = round((count_val / total * 100) if total > 0 else 0, 1)
-                category_stats[category] = {'count': count_val, 'percent': percent}
-
-            avg_prob_query = select(func.avg(self.model.ip))
-            avg_prob_result = await self.session.execute(avg_prob_query)
-            avg_prob_scalar = avg_prob_result.scalar()
-            if hasattr(avg_prob_scalar, '__await__'):
-                avg_prob_value = await avg_prob_scalar
-            else:
-                avg_prob_value = avg_prob_scalar
-            avg_probability = 0.0 if avg_prob_value is None else round(avg_prob_value, 6)
-
-            max_energy_query = select(func.max(self.model.energy_megatons))
-            max_energy_result = await self.session.execute(max_energy_query)
-            max_energy_scalar = max_energy_result.scalar()
-            if hasattr(max_energy_scalar, '__await__'):
-                max_energy_value = await max_energy_scalar
-            else:
-                max_energy_value = max_energy_scalar
-            max_energy = 0.0 if max_energy_value is None else float(max_energy_value)
-
-            avg_energy_query = select(func.avg(self.model.energy_megatons))
-            avg_energy_result = await self.session.execute(avg_energy_query)
-            avg_energy_scalar = avg_energy_result.scalar()
-            if hasattr(avg_energy_scalar, '__await__'):
-                avg_energy_value = await avg_energy_scalar
-            else:
-                avg_energy_value = avg_energy_scalar
-            avg_energy = 0.0 if avg_energy_value is None else round(avg_energy_value, 1)
-
-            non_zero_query = select(func.count()).where(self.model.ip > 0)
-            non_zero_result = await self.session.execute(non_zero_query)
-            non_zero_scalar = non_zero_result.scalar()
-            if hasattr(non_zero_scalar, '__await__'):
-                non_zero_value = await non_zero_scalar
-            else:
-                non_zero_value = non_zero_scalar
-            non_zero_count = non_zero_value or 0
-
-            high_risk_query = select(func.count()).where(self.model.ts_max >= 5)
-            high_risk_result = await self.session.execute(high_risk_query)
-            high_risk_scalar = high_risk_result.scalar()
-            if hasattr(high_risk_scalar, '__await__'):
-                high_risk_value = await high_risk_scalar
-            else:
-                high_risk_value = high_risk_scalar
-            high_risk_count = high_risk_value or 0
+                return {'count': count_val, 'percent': percent}
+
+            ts_stats = {f"ts_{ts}": distribution_entry(next(values)) for ts in ts_values}
+            category_stats = {category: distribution_entry(next(values)) for category in categories}
+
+            avg_prob_value, max_energy_value, avg_energy_value, non_zero_value, high_risk_value = values
 
             return {
                 "total_threats": total,
                 "torino_scale_distribution": ts_stats,
                 "impact_category_distribution": category_stats,
-                "average_probability": avg_probability,
-                "average_energy_mt": avg_energy,
-                "max_energy_mt": max_energy,
-                "non_zero_probability_count": non_zero_count,
-                "high_risk_count": high_risk_count,
+                "average_probability": 0.0 if avg_prob_value is None else round(avg_prob_value, 6),
+                "average_energy_mt": 0.0 if avg_energy_value is None else round(avg_energy_value, 1),
+                "max_energy_mt": 0.0 if max_energy_value is None else float(max_energy_value),
+                "non_zero_probability_count": non_zero_value or 0,
+                "high_risk_count": high_risk_value or 0,
                 "last_updated": datetime.now().isoformat()
             }
 
@@ -153,12 +167,12 @@ class ThreatRepository(BaseRepository[ThreatAssessmentModel]):
         try:
             query = delete(self.model).where(self.model.designation.notin_(designations))
             result = await self.session.execute(query)
-            await self.session.commit()
+            await self._commit()
             deleted_count = result.rowcount
             logger.info(f"Удалено {deleted_count} угроз, которых нет в списке NASA")
             return deleted_count
         except Exception as e:
-            await self.session.rollback()
+            await self._rollback(e)
             logger.error(f"Ошибка удаления угроз: {e}")
             return 0
 
@@ -175,10 +189,10 @@ class ThreatRepository(BaseRepository[ThreatAssessmentModel]):
                     logger.info(f"Удалена угроза {threat.designation} - все года риска в прошлом")
 
             if deleted_count > 0:
-                await self.session.commit()
+                await self._commit()
                 logger.info(f"Удалено {deleted_count} угроз с истёкшими годами риска")
             return deleted_count
         except Exception as e:
-            await self.session.rollback()
+            await self._rollback(e)
             logger.error(f"Ошибка удаления угроз с истёкшими годами: {e}")
             return 0
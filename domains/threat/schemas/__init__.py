@@ -1,3 +1,3 @@
-from .threat_schema import ThreatAssessmentBase, ThreatAssessmentResponse
+from .threat_schema import ThreatAssessmentBase, ThreatAssessmentResponse, ThreatAssessmentPage
 
-__all__ = ['ThreatAssessmentBase', 'ThreatAssessmentResponse']
+__all__ = ['ThreatAssessmentBase', 'ThreatAssessmentResponse', 'ThreatAssessmentPage']
@@ -1,5 +1,5 @@
 from typing import List
-from pydantic import Field
+from pydantic import BaseModel, Field
 from shared.infrastructure import BaseSchema
 
 class ThreatAssessmentBase(BaseSchema):
@@ -25,3 +25,10 @@ class ThreatAssessmentBase(BaseSchema):
 class ThreatAssessmentResponse(ThreatAssessmentBase):
     """Схема для ответа API с оценкой угрозы"""
     pass
+
+class ThreatAssessmentPage(BaseModel):
+    """Страница оценок угроз вместе с общим количеством записей"""
+    items: List[ThreatAssessmentResponse]
+    total: int
+    page: int
+    size: int
@@ -1,13 +1,18 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+from itertools import groupby
+from operator import attrgetter
 from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
 import logging
 
 from shared.infrastructure.services.base_service import BaseService
 from domains.threat import ThreatAssessmentModel, ThreatRepository
-from shared.transaction.uow import UnitOfWork
+from shared.utils.cache import async_ttl_cache
 
 logger = logging.getLogger(__name__)
 
+# Верхняя граница limit для списочных запросов (фронтенд запрашивает до 10000 записей)
+MAX_LIMIT = 10000
+
 
 class ThreatService(BaseService):
     """Сервис для работы с оценками угроз астероидов"""
@@ -15,54 +20,128 @@ class ThreatService(BaseService):
     def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
         super().__init__(session_factory, ThreatAssessmentModel)
 
+    @staticmethod
+    def _clamp(skip: int, limit: Optional[int], max_limit: int = MAX_LIMIT) -> Tuple[int, int]:
+        """Проверка пагинации до обращения к БД: отрицательные значения запрещены, limit ограничен сверху"""
+        if skip < 0:
+            raise ValueError(f"skip must be non-negative, got {skip}")
+        if limit is not None and limit < 0:
+            raise ValueError(f"limit must be non-negative, got {limit}")
+        return skip, min(limit or 100, max_limit)
+
+    @classmethod
+    def invalidate_cache(cls) -> None:
+        """Сброс закешированных чтений после изменения угроз.
+
+        Сбрасывает кеш только текущего процесса: изменения, сделанные
+        run_update.py, процесс API увидит по истечении TTL.
+        """
+        cls.get_by_designation.cache_clear()
+        cls.get_by_asteroid_id.cache_clear()
+        cls.get_statistics.cache_clear()
+
+    async def bulk_create_threats(self, threats_data: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """Массовое создание/обновление оценок угроз с последующим сбросом кеша"""
+        async with self._acquire_uow() as uow:
+            result = await uow.threat_repo.bulk_create_threats(threats_data)
+        self.invalidate_cache()
+        return result
+
+    @async_ttl_cache(ttl=300)
     async def get_by_designation(self, designation: str) -> Optional[Dict[str, Any]]:
         """Получение оценки угрозы по обозначению астероида"""
-        async with UnitOfWork(self.session_factory) as uow:
+        async with self._acquire_uow() as uow:
             threat = await uow.threat_repo.get_by_designation(designation)
             return self._model_to_dict(threat) if threat else None
 
+    @async_ttl_cache(ttl=300)
     async def get_by_asteroid_id(self, asteroid_id: int) -> Optional[Dict[str, Any]]:
         """Получение оценки угрозы для астероида по его ID"""
-        async with UnitOfWork(self.session_factory) as uow:
+        async with self._acquire_uow() as uow:
             threat = await uow.threat_repo.get_by_asteroid_id(asteroid_id)
             return self._model_to_dict(threat) if threat else None
 
     async def get_high_risk(self, limit: Optional[int] = None, skip: int = 0) -> List[Dict[str, Any]]:
         """Получение угроз с высоким уровнем риска (туринская шкала >= 5)"""
-        return await self.filter({"ts_max__ge": 5}, skip, limit or 100, order_by="ts_max", order_desc=True)
+        skip, limit = self._clamp(skip, limit)
+        return await self.filter({"ts_max__ge": 5}, skip, limit, order_by="ts_max", order_desc=True)
 
     async def get_by_risk_level(self, min_ts: int = 0, max_ts: int = 10, skip: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Получение угроз по диапазону значений Туринской шкалы"""
+        skip, limit = self._clamp(skip, limit)
         filters = {"ts_max__ge": min_ts, "ts_max__le": max_ts}
-        return await self.filter(filters, skip, limit or 100, order_by="ts_max", order_desc=True)
+        return await self.filter(filters, skip, limit, order_by="ts_max", order_desc=True)
 
+    @async_ttl_cache(ttl=60)
     async def get_statistics(self) -> Dict[str, Any]:
         """Возвращает статистику по оценкам угроз астероидов"""
-        async with UnitOfWork(self.session_factory) as uow:
+        async with self._acquire_uow() as uow:
             return await uow.threat_repo.get_statistics()
 
     async def get_by_probability(self, min_probability: float = 0.0, max_probability: float = 1.0, skip: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Получение угроз по диапазону вероятности столкновения"""
+        skip, limit = self._clamp(skip, limit)
         filters = {"ip__ge": min_probability, "ip__le": max_probability}
-        return await self.filter(filters, skip, limit or 100, order_by="ip", order_desc=True)
+        return await self.filter(filters, skip, limit, order_by="ip", order_desc=True)
 
     async def get_by_energy(self, min_energy: float = 0.0, max_energy: Optional[float] = None, skip: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Получение угроз по диапазону энергии воздействия"""
+        skip, limit = self._clamp(skip, limit)
         filters = {"energy_megatons__ge": min_energy}
         if max_energy is not None:
             filters["energy_megatons__le"] = max_energy
-        return await self.filter(filters, skip, limit or 100, order_by="energy_megatons", order_desc=True)
+        return await self.filter(filters, skip, limit, order_by="energy_megatons", order_desc=True)
 
     async def get_by_category(self, category: str, skip: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Получение угроз по категории воздействия"""
-        return await self.filter({"impact_category": category}, skip, limit or 100, order_by="energy_megatons", order_desc=True)
+        skip, limit = self._clamp(skip, limit)
+        return await self.filter({"impact_category": category}, skip, limit, order_by="energy_megatons", order_desc=True)
+
+    async def get_by_risk_level_page(self, min_ts: int = 0, max_ts: int = 10, skip: int = 0, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Страница угроз по диапазону Туринской шкалы вместе с общим количеством"""
+        skip, limit = self._clamp(skip, limit)
+        filters = {"ts_max__ge": min_ts, "ts_max__le": max_ts}
+        return await self.filter_page(filters, skip, limit, order_by="ts_max", order_desc=True)
+
+    async def get_by_probability_page(self, min_probability: float = 0.0, max_probability: float = 1.0, skip: int = 0, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Страница угроз по диапазону вероятности столкновения вместе с общим количеством"""
+        skip, limit = self._clamp(skip, limit)
+        filters = {"ip__ge": min_probability, "ip__le": max_probability}
+        return await self.filter_page(filters, skip, limit, order_by="ip", order_desc=True)
+
+    async def get_by_energy_page(self, min_energy: float = 0.0, max_energy: Optional[float] = None, skip: int = 0, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Страница угроз по диапазону энергии воздействия вместе с общим количеством"""
+        skip, limit = self._clamp(skip, limit)
+        filters = {"energy_megatons__ge": min_energy}
+        if max_energy is not None:
+            filters["energy_megatons__le"] = max_energy
+        return await self.filter_page(filters, skip, limit, order_by="energy_megatons", order_desc=True)
+
+    async def get_by_category_page(self, category: str, skip: int = 0, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Страница угроз по категории воздействия вместе с общим количеством"""
+        skip, limit = self._clamp(skip, limit)
+        return await self.filter_page({"impact_category": category}, skip, limit, order_by="energy_megatons", order_desc=True)
+
+    async def get_by_categories(self, categories: List[str], skip: int = 0, limit: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Получение угроз по нескольким категориям воздействия, сгруппированных по категории"""
+        skip, limit = self._clamp(skip, limit)
+        async with self._acquire_uow() as uow:
+            threats = await uow.threat_repo.get_threats_by_impact_categories(categories, skip, limit)
+            grouped = {category: [] for category in categories}
+            for category, items in groupby(threats, key=attrgetter("impact_category")):
+                grouped[category] = [self._model_to_dict(t) for t in items]
+            return grouped
 
     async def delete_threats_not_in_designations(self, designations: List[str]) -> int:
         """Удаляет угрозы, которых нет в списке NASA"""
-        async with UnitOfWork(self.session_factory) as uow:
-            return await uow.threat_repo.delete_threats_not_in_designations(designations)
+        async with self._acquire_uow() as uow:
+            deleted = await uow.threat_repo.delete_threats_not_in_designations(designations)
+        self.invalidate_cache()
+        return deleted
 
     async def delete_threats_with_expired_years(self, current_year: int) -> int:
         """Удаляет угрозы у которых все года риска в прошлом"""
-        async with UnitOfWork(self.session_factory) as uow:
-            return await uow.threat_repo.delete_threats_with_expired_years(current_year)
+        async with self._acquire_uow() as uow:
+            deleted = await uow.threat_repo.delete_threats_with_expired_years(current_year)
+        self.invalidate_cache()
+        return deleted
@@ -1,11 +1,15 @@
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from api import asteroid_router, approach_router, threat_router
+from shared.database import async_session_factory
+from shared.transaction import request_scope
 
 
-app = FastAPI()
+# Ответы сериализуются orjson вместо стандартного json
+app = FastAPI(default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -15,6 +19,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def unit_of_work_per_request(request: Request, call_next):
+    """Один UnitOfWork (и одно соединение из пула) на весь запрос к API"""
+    if not request.url.path.startswith("/api/"):
+        return await call_next(request)
+    async with request_scope(async_session_factory):
+        return await call_next(request)
+
 app.include_router(asteroid_router, prefix="/api/v1")
 app.include_router(approach_router, prefix="/api/v1")
 app.include_router(threat_router, prefix="/api/v1")
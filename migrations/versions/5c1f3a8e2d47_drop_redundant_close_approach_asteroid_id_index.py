@@ -0,0 +1,27 @@
+"""drop redundant close approach asteroid_id index
+
+Revision ID: 5c1f3a8e2d47
+Revises: ce0e4aebe81a
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1f3a8e2d47'
+down_revision: Union[str, None] = 'ce0e4aebe81a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Выборки по asteroid_id с сортировкой по approach_time обслуживает индекс uq_asteroid_approach_time
+    op.drop_index(op.f('ix_close_approach_models_asteroid_id'), table_name='close_approach_models')
+
+
+def downgrade() -> None:
+    op.create_index(op.f('ix_close_approach_models_asteroid_id'), 'close_approach_models', ['asteroid_id'], unique=False)
@@ -0,0 +1,28 @@
+"""add asteroid moid and orbit class indexes
+
+Revision ID: 8b2d6e41c9f3
+Revises: 5c1f3a8e2d47
+Create Date: 2026-10-17 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2d6e41c9f3'
+down_revision: Union[str, None] = '5c1f3a8e2d47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_asteroid_models_earth_moid_au', 'asteroid_models', ['earth_moid_au'], unique=False)
+    op.create_index('ix_asteroid_models_orbit_class_designation', 'asteroid_models', ['orbit_class', 'designation'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_asteroid_models_orbit_class_designation', table_name='asteroid_models')
+    op.drop_index('ix_asteroid_models_earth_moid_au', table_name='asteroid_models')
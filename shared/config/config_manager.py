@@ -13,12 +13,15 @@ logger = logging.getLogger(__name__)
 
 
 class DatabaseConfig(BaseModel):
-    """Конфигурация базы данных. Все параметры берутся ТОЛЬКО из переменных окружения: DB_HOST, DB_PORT, DB_USER, DB_PASSWORD, DB_NAME"""
+    """Конфигурация базы данных. Все параметры берутся ТОЛЬКО из переменных окружения: DB_HOST, DB_PORT, DB_USER, DB_PASSWORD, DB_NAME, DB_POOL_SIZE, DB_MAX_OVERFLOW"""
     host: str = Field(default_factory=lambda: os.getenv('DB_HOST'))
     port: int = Field(default_factory=lambda: int(os.getenv('DB_PORT', '5432')))
     user: str = Field(default_factory=lambda: os.getenv('DB_USER'))
     password: str = Field(default_factory=lambda: os.getenv('DB_PASSWORD'))
     db_name: str = Field(default_factory=lambda: os.getenv('DB_NAME'))
+    pool_size: int = Field(default_factory=lambda: int(os.getenv('DB_POOL_SIZE', '10')))
+    max_overflow: int = Field(default_factory=lambda: int(os.getenv('DB_MAX_OVERFLOW', '20')))
+    pool_timeout: int = Field(default_factory=lambda: int(os.getenv('DB_POOL_TIMEOUT', '10')))
 
     @property
     def dsn(self) -> str:
@@ -56,7 +59,7 @@ class NasaApiConfig(BaseModel):
     rate_limit_period: int = Field(default=3600)
     timeout: int = Field(default=30)
     retry_attempts: int = Field(default=3)
-    sbdb_timeout: int = Field(default=60)
+    sbdb_bulk_timeout: int = Field(default=180)
     cad_timeout: int = Field(default=120)
     sentry_timeout: int = Field(default=180)
 
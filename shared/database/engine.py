@@ -1,4 +1,5 @@
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from typing import AsyncGenerator
 from shared.config import get_config
 import logging
@@ -7,11 +8,23 @@ logger = logging.getLogger(__name__)
 
 config = get_config()
 
+# Пул рассчитан на одновременные HTTP-запросы к API.
+# Для async-движка нужен именно AsyncAdaptedQueuePool: синхронный QueuePool с ним не работает
 async_engine = create_async_engine(
     url=config.get_database_url(),
     echo=False,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=config.database.pool_size,
+    max_overflow=config.database.max_overflow,
+    pool_timeout=config.database.pool_timeout,
     pool_pre_ping=True,
-    pool_recycle=3600
+    pool_recycle=1800,
+    # Короткие OLTP-запросы: JIT PostgreSQL только добавляет время компиляции.
+    # Кеш подготовленных выражений asyncpg расширен под все варианты фильтров репозиториев
+    connect_args={
+        'server_settings': {'jit': 'off'},
+        'prepared_statement_cache_size': 500
+    }
 )
 
 async_session_factory = async_sessionmaker(
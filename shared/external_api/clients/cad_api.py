@@ -1,18 +1,43 @@
 import asyncio
 import logging
+import time
 import aiohttp
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+import numpy as np
+import orjson
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta, timezone
+from operator import itemgetter
+from typing import List, Dict, Any, Optional, Tuple, FrozenSet
 from shared.utils.get_date import GetDate
-from shared.utils.error_handlers import nasa_api_endpoint, validate_response, log_execution_time
+from shared.utils.error_handlers import nasa_api_endpoint, validate_response, log_execution_time, RETRY_HTTP_STATUS_CODES
 from shared.resilience import circuit_breaker, NASA_API_CIRCUIT_CONFIG, bulkhead, CAD_BULKHEAD_CONFIG, timeout, NASA_API_TIMEOUTS
 
 logger = logging.getLogger(__name__)
 
+# Астрономическая единица в километрах
+AU_KM = 149597870.7
+# Месяцы в штатном формате поля 'cd' ответа CAD API: 'YYYY-Mon-DD HH:MM'
+CAD_MONTHS = {
+    'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6,
+    'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12
+}
+
 class CADClient(GetDate):
     """Асинхронный клиент для получения данных о сближениях"""
     
     CAD_API_URL = "https://ssd-api.jpl.nasa.gov/cad.api"
+    # Тела ответов CAD по ключу (date-min, date-max, dist-max); общий для всех экземпляров клиента.
+    # Хранятся байты, поэтому каждое обращение к кешу разбирает собственную копию ответа
+    RESPONSE_CACHE_TTL = 300
+    RESPONSE_CACHE_MAXSIZE = 8
+    _response_cache: OrderedDict[Tuple[str, str, str], Tuple[float, bytes]] = OrderedDict()
+
+    # Неизменная часть запроса собирается один раз при загрузке класса
+    STATIC_PARAMS = {
+        'body': 'Earth',
+        'sort': 'dist',
+        'fullname': 'true'
+    }
     
     def __init__(self, timeout: int = 30):
         super().__init__()
@@ -21,6 +46,7 @@ class CADClient(GetDate):
         
     async def __aenter__(self):
         self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=10, keepalive_timeout=30),
             timeout=aiohttp.ClientTimeout(total=self.timeout),
             headers={
                 'User-Agent': 'AsteroidWatchBot/1.0',
@@ -32,6 +58,11 @@ class CADClient(GetDate):
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.session:
             await self.session.close()
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Сбрасывает закешированные ответы CAD API"""
+        cls._response_cache.clear()
     
     @circuit_breaker(NASA_API_CIRCUIT_CONFIG)
     @bulkhead(CAD_BULKHEAD_CONFIG)
@@ -56,19 +87,32 @@ class CADClient(GetDate):
             'date-min': start_date.strftime('%Y-%m-%d'),
             'date-max': end_date.strftime('%Y-%m-%d'),
             'dist-max': str(max_distance_au),
-            'body': 'Earth',
-            'sort': 'dist',
-            'fullname': 'true'
+            **self.STATIC_PARAMS
         }
 
+        # Множество для фильтрации строится один раз на вызов, в т.ч. для ответа из кеша
+        asteroid_set = frozenset(asteroid_ids) if asteroid_ids else None
+
+        cache_key = (params['date-min'], params['date-max'], params['dist-max'])
+        cached_data = self._get_cached_response(cache_key)
+        if cached_data is not None:
+            logger.info("Ответ CAD API взят из кеша")
+            return await self._process_cad_response(cached_data, asteroid_set)
+
         try:
             async with self.session.get(self.CAD_API_URL, params=params) as response:
+                # Временные ошибки сервера пробрасываются и повторяются декоратором nasa_api_endpoint
+                if response.status in RETRY_HTTP_STATUS_CODES:
+                    response.raise_for_status()
+
                 # Проверяем статус ответа
                 if response.status != 200:
                     logger.warning(f"CAD API вернул статус {response.status}")
                     return {}
                 
-                data = await response.json()
+                # Тело разбирается orjson напрямую из байтов, без промежуточной строки
+                body = await response.read()
+                data = orjson.loads(body)
                 
                 # Проверяем структуру ответа
                 if not data:
@@ -98,14 +142,16 @@ class CADClient(GetDate):
                         logger.warning(f"Неизвестный формат ответа CAD API: {data}")
                         return {}
                 
+                self._store_response(cache_key, body)
+
                 # Если есть fields и data, обрабатываем
-                approaches = await self._process_cad_response(data, asteroid_ids)
-                logger.info(f"Получено {len(approaches)} уникальных сближений")
-                return approaches
+                return await self._process_cad_response(data, asteroid_set)
                 
         except asyncio.TimeoutError:
             logger.error("Таймаут при запросе к CAD API")
             return {}
+        except (aiohttp.ClientResponseError, aiohttp.ClientConnectionError):
+            raise
         except aiohttp.ClientError as e:
             logger.error(f"Ошибка сети при запросе к CAD API: {e}")
             return {}
@@ -113,37 +159,126 @@ class CADClient(GetDate):
             logger.error(f"Неожиданная ошибка в CAD API: {e}")
             return {}
             
+    def _get_cached_response(self, cache_key: Tuple[str, str, str]) -> Optional[Dict[str, Any]]:
+        """Возвращает закешированный ответ CAD, попутно удаляя устаревшие записи"""
+        now = time.monotonic()
+        for key in [k for k, (expires, _) in self._response_cache.items() if expires <= now]:
+            del self._response_cache[key]
+
+        entry = self._response_cache.get(cache_key)
+        if entry is None:
+            return None
+        self._response_cache.move_to_end(cache_key)
+        return orjson.loads(entry[1])
+
+    def _store_response(self, cache_key: Tuple[str, str, str], body: bytes) -> None:
+        """Сохраняет тело ответа CAD, вытесняя давно не запрошенные записи сверх RESPONSE_CACHE_MAXSIZE"""
+        self._response_cache[cache_key] = (time.monotonic() + self.RESPONSE_CACHE_TTL, body)
+        self._response_cache.move_to_end(cache_key)
+        while len(self._response_cache) > self.RESPONSE_CACHE_MAXSIZE:
+            self._response_cache.popitem(last=False)
+
     async def _process_cad_response(
         self,
         cad_data: Dict[str, Any],
-        filter_ids: Optional[List[str]] = None
+        filter_set: Optional[FrozenSet[str]] = None
     ) -> Dict[str, List[Dict[str, Any]]]:
         """Обрабатывает ответ CAD API и преобразует его в формат сближений"""
-        results = {}
-        
         if 'data' not in cad_data or not cad_data['data']:
             logger.warning("Нет данных в ответе CAD API")
-            return results
+            return {}
             
         fields = cad_data.get('fields', [])
         field_indices = self._extract_field_indices(fields)
+        if not field_indices:
+            return {}
         
-        filter_set = set(filter_ids) if filter_ids else None
-        
-        for entry in cad_data['data']:
-            try:
-                approach_record = self._parse_cad_entry(entry, field_indices, filter_set)
-                if approach_record:
-                    des = approach_record['asteroid_number']
-                    if des not in results:
-                        results[des] = []
-                    results[des].append(approach_record)
-            except (IndexError, ValueError, TypeError) as e:
-                logger.warning(f"Ошибка обработки записи сближения: {e}")
+        # Структура проверяется один раз: короткие строки отбрасываются до основного цикла
+        min_len = max(field_indices.values()) + 1
+        rows = [entry for entry in cad_data['data'] if len(entry) >= min_len]
+        skipped = len(cad_data['data']) - len(rows)
+
+        # Нужные колонки извлекаются одним проходом itemgetter на C-уровне
+        get_columns = itemgetter(field_indices['des'], field_indices['cd'], field_indices['dist'], field_indices['v_rel'])
+        fullname_index = field_indices['fullname']
+
+        selected = []
+        for (des, cd_str, dist, v_rel), entry in zip(map(get_columns, rows), rows):
+            des = str(des)
+            if filter_set and des not in filter_set:
                 continue
-                
-        return results
+            selected.append((des, cd_str, dist, v_rel, entry))
+
+        # Числовые колонки переводятся в float и пересчитываются в км векторно
+        distances = self._to_float_array([row[2] for row in selected])
+        velocities = self._to_float_array([row[3] for row in selected])
+        valid = np.isfinite(distances) & np.isfinite(velocities)
+        distances_km = distances * AU_KM
+        # Колонка дат разбирается целиком через map, без интерпретируемого цикла
+        approach_times = list(map(self._parse_cad_date_or_none, [row[1] for row in selected]))
+
+        # defaultdict: один поиск по ключу на строку вместо setdefault
+        results = defaultdict(list)
+        total_records = 0
+
+        for (des, _, _, _, entry), is_valid, approach_time, distance_au, distance_km, velocity_km_s in zip(
+            selected, valid.tolist(), approach_times, distances.tolist(), distances_km.tolist(), velocities.tolist()
+        ):
+            if not is_valid or approach_time is None:
+                skipped += 1
+                continue
+
+            results[des].append({
+                'approach_time': approach_time,
+                'distance_au': distance_au,
+                'distance_km': distance_km,
+                'velocity_km_s': velocity_km_s,
+                'asteroid_number': des,
+                'asteroid_name': str(entry[fullname_index]) if fullname_index >= 0 else des,
+                'data_source': 'NASA CAD API'
+            })
+            total_records += 1
+
+        if skipped:
+            logger.warning(f"Пропущено {skipped} некорректных записей сближений")
+
+        logger.info(f"Обработано {len(results)} уникальных астероидов, всего {total_records} сближений")
+
+        return dict(results)
     
+    @staticmethod
+    def _to_float_array(values: List[Any]) -> np.ndarray:
+        """Преобразует колонку в массив float64; некорректные значения становятся NaN"""
+        try:
+            return np.asarray(values, dtype=np.float64)
+        except (ValueError, TypeError):
+            converted = np.empty(len(values), dtype=np.float64)
+            for i, value in enumerate(values):
+                try:
+                    converted[i] = float(value)
+                except (ValueError, TypeError):
+                    converted[i] = np.nan
+            return converted
+
+    def _parse_cad_date_exact(self, cd_str: str) -> datetime:
+        """Быстрый разбор штатного формата 'cd' срезами фиксированной ширины; прочие случаи - в GetDate"""
+        if len(cd_str) == 17:
+            try:
+                return datetime(
+                    int(cd_str[0:4]), CAD_MONTHS[cd_str[5:8]], int(cd_str[9:11]),
+                    int(cd_str[12:14]), int(cd_str[15:17]), tzinfo=timezone.utc
+                )
+            except (KeyError, ValueError):
+                pass
+        return super()._parse_cad_date_exact(cd_str)
+
+    def _parse_cad_date_or_none(self, cd_str: Any) -> Optional[datetime]:
+        """Разбор даты 'cd'; None для строк, которые не удалось распарсить"""
+        try:
+            return self._parse_cad_date_exact(str(cd_str))
+        except (ValueError, TypeError):
+            return None
+
     def _extract_field_indices(self, fields: List[str]) -> Dict[str, int]:
         """Извлекает индексы полей из заголовков CAD API"""
         try:
@@ -157,38 +292,3 @@ class CADClient(GetDate):
         except ValueError as e:
             logger.error(f"Неожиданная структура полей: {e}")
             return {}
-    
-    def _parse_cad_entry(
-        self, 
-        entry: List[Any], 
-        field_indices: Dict[str, int],
-        filter_set: Optional[set]
-    ) -> Optional[Dict[str, Any]]:
-        """Парсит одну запись сближения из CAD API"""
-        des = str(entry[field_indices['des']])
-        
-        if filter_set and des not in filter_set:
-            return None
-            
-        cd_str = str(entry[field_indices['cd']])
-        distance_au = float(entry[field_indices['dist']])
-        velocity_km_s = float(entry[field_indices['v_rel']])
-        
-        asteroid_name = self._extract_asteroid_name(entry, field_indices, des)
-        approach_time = self._parse_cad_date_exact(cd_str)
-        
-        return {
-            'approach_time': approach_time,
-            'distance_au': distance_au,
-            'distance_km': distance_au * 149597870.7,
-            'velocity_km_s': velocity_km_s,
-            'asteroid_number': des,
-            'asteroid_name': asteroid_name,
-            'data_source': 'NASA CAD API'
-        }
-    
-    def _extract_asteroid_name(self, entry: List[Any], field_indices: Dict[str, int], default: str) -> str:
-        """Извлекает имя астероида из записи CAD"""
-        if field_indices['fullname'] != -1 and field_indices['fullname'] < len(entry):
-            return str(entry[field_indices['fullname']])
-        return default
\ No newline at end of file
@@ -1,33 +1,43 @@
 import logging
 import aiohttp
-import asyncio
+import numpy as np
+import orjson
 import re
-from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
 from typing import List, Dict, Any, Optional
 from shared.utils.space_math import get_size_by_albedo, get_size_by_h_mag
-from shared.utils.error_handlers import (
-    nasa_api_endpoint,
-    retry_with_exponential_backoff,
-    fallback_on_error,
-    NetworkError
-)
+from shared.utils.error_handlers import nasa_api_endpoint
 from shared.resilience import circuit_breaker, NASA_API_CIRCUIT_CONFIG, bulkhead, SBDB_BULKHEAD_CONFIG, timeout, NASA_API_TIMEOUTS
 
 logger = logging.getLogger(__name__)
 
+# Символы, из которых состоит число без единиц измерения
+_PLAIN_NUMBER_CHARS = frozenset('0123456789.+-e')
+# Первое число в строке со значением параметра
+_NUM_RE = re.compile(r'[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?')
+# Имя в полном названии вида '99942 Apophis (2004 MN4)'
+_NAME_RE = re.compile(r'\s*([^(]*?[^\d\s(][^(]*?)\s*\(')
+# Названия классов орбит по кодам SBDB
+ORBIT_CLASS_NAMES = {
+    'IEO': 'Atira',
+    'ATE': 'Aten',
+    'APO': 'Apollo',
+    'AMO': 'Amor',
+}
+
 class NASASBDBClient:
     """Клиент для работы с NASA Small-Body Database"""
     
     SBDB_QUERY_URL = "https://ssd-api.jpl.nasa.gov/sbdb_query.api"
+    # Поля, запрашиваемые для всех PHA одним запросом
+    SBDB_FIELDS = 'pdes,full_name,H,diameter,albedo,moid,q,ad,a,e,class,orbit_id'
+    # Числовые колонки ответа, приводимые к float целиком
+    SBDB_NUMERIC_FIELDS = frozenset({'H', 'diameter', 'albedo', 'moid', 'q', 'ad', 'a', 'e'})
+    MAX_PHA_COUNT = 5000
     
-    def __init__(self, timeout: int = 60, max_workers: int = 10, 
-                 batch_size: int = 50, delay_between_batches: float = 1.0):
+    def __init__(self, timeout: int = 180):
         self.timeout = timeout
-        self.max_workers = max_workers
-        self.batch_size = batch_size
-        self.delay_between_batches = delay_between_batches
         self.session: Optional[aiohttp.ClientSession] = None
-        self.executor = ThreadPoolExecutor(max_workers=max_workers)
         
     async def __aenter__(self):
         self.session = aiohttp.ClientSession(
@@ -39,7 +49,6 @@ class NASASBDBClient:
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.session:
             await self.session.close()
-        self.executor.shutdown(wait=True)
     
     @nasa_api_endpoint(max_retries=3)
     async def get_asteroids(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
@@ -47,52 +56,31 @@ class NASASBDBClient:
         if not self.session:
             raise RuntimeError("Сессия не инициализирована")
 
-        logger.info("Получение списка потенциально опасных астероидов...")
-        designations = await self._get_all_pha_designations(limit)
+        logger.info("Получение данных о потенциально опасных астероидах...")
+        rows = await self._fetch_all_pha(limit)
 
-        if not designations:
-            logger.warning("Не получено обозначений PHA")
+        if not rows:
+            logger.warning("Не получено данных PHA")
             return []
 
-        logger.info(f"Получено {len(designations)} обозначений")
-        logger.info(f"Запрос данных для {len(designations)} астероидов...")
-
-        results = []
-        failed = 0
-
-        for i in range(0, len(designations), self.batch_size):
-            batch = designations[i:i + self.batch_size]
-            batch_results = await self._process_batch(batch)
-
-            for result in batch_results:
-                if isinstance(result, dict):
-                    results.append(result)
-                else:
-                    failed += 1
-                    if failed <= 10:
-                        logger.warning(f"Ошибка обработки: {type(result).__name__}")
-
-            if i + self.batch_size < len(designations):
-                await asyncio.sleep(self.delay_between_batches)
-
-            processed = min(i + self.batch_size, len(designations))
-            logger.info(f"Обработано {processed}/{len(designations)} астероидов")
+        results = [self._parse_sbdb_row(row) for row in rows]
 
         self._log_diameter_statistics(results)
-        logger.info(f"Успешно получено {len(results)} астероидов, не удалось: {failed}")
+        logger.info(f"Успешно получено {len(results)} астероидов")
 
         return results
 
-    async def _get_all_pha_designations(self, limit: Optional[int] = None) -> List[str]:
-        """Получает список обозначений PHA астероидов одним запросом к NASA API."""
-        logger.info("Запрос полного списка PHA астероидов...")
-
-        MAX_PHA_COUNT = 5000
-        api_limit = min(limit, MAX_PHA_COUNT) if limit else MAX_PHA_COUNT
+    @circuit_breaker(NASA_API_CIRCUIT_CONFIG)
+    @bulkhead(SBDB_BULKHEAD_CONFIG)
+    @timeout(NASA_API_TIMEOUTS['sbdb_bulk'])
+    async def _fetch_all_pha(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Получает параметры всех PHA одним запросом к sbdb_query.api вместо запроса на каждый астероид"""
+        api_limit = min(limit, self.MAX_PHA_COUNT) if limit else self.MAX_PHA_COUNT
 
         params = {
-            'fields': 'pdes',
+            'fields': self.SBDB_FIELDS,
             'sb-group': 'pha',
+            'full-prec': 'true',
             'limit': api_limit
         }
 
@@ -100,101 +88,56 @@ class NASASBDBClient:
 
         async with self.session.get(self.SBDB_QUERY_URL, params=params) as response:
             response.raise_for_status()
-            data = await response.json()
-
-            if 'data' not in data or not data['data']:
-                logger.warning("Не получено данных от NASA API")
-                return []
-
-            all_designations = [item[0] for item in data.get('data', []) if item[0]]
-
-            # Применяем локальный лимит если нужно
-            if limit and len(all_designations) > limit:
-                all_designations = all_designations[:limit]
+            data = orjson.loads(await response.read())
 
-            logger.info(f"Получено {len(all_designations)} PHA астероидов")
-            return all_designations
-    
-    async def _process_batch(self, batch: List[str]) -> List:
-        """Обрабатывает батч астероидов"""
-        # Создаем задачи для асинхронного выполнения
-        tasks = [self._fetch_with_astroquery(des) for des in batch]
+        if not data.get('data'):
+            logger.warning("Не получено данных от NASA API")
+            return []
 
-        batch_results = await asyncio.gather(*tasks, return_exceptions=True)
+        fields = data.get('fields', [])
+        # Числовые колонки преобразуются векторно, а не строкой за строкой в _extract_astro_value
+        columns = [list(column) for column in zip(*data['data'])]
+        for i, field in enumerate(fields):
+            if field in self.SBDB_NUMERIC_FIELDS:
+                columns[i] = self._to_float_column(columns[i])
 
-        # Обработка конкретных ошибок NASA
-        for i, result in enumerate(batch_results):
-            if isinstance(result, Exception):
-                if "rate limit" in str(result).lower():
-                    await asyncio.sleep(65)  # Ждем чуть больше минуты
-                    # Повторяем запрос для этого астероида
-                    try:
-                        retry_result = await self._fetch_with_astroquery(batch[i])
-                        batch_results[i] = retry_result
-                    except:
-                        batch_results[i] = self._create_fallback_asteroid(batch[i])
+        rows = [dict(zip(fields, values)) for values in zip(*columns)]
+        rows = [row for row in rows if row.get('pdes')]
 
-        processed_results = []
+        # Применяем локальный лимит если нужно
+        if limit and len(rows) > limit:
+            rows = rows[:limit]
 
-        for des, result in zip(batch, batch_results):
-            if isinstance(result, dict):
-                processed_results.append(result)
-            elif isinstance(result, Exception) or result is None:
-                processed_results.append(self._create_fallback_asteroid(des))
-            else:
-                processed_results.append(None)
+        logger.info(f"Получено {len(rows)} PHA астероидов")
+        return rows
 
-        return processed_results
-    
-    @circuit_breaker(NASA_API_CIRCUIT_CONFIG)
-    @bulkhead(SBDB_BULKHEAD_CONFIG)
-    @timeout(NASA_API_TIMEOUTS['sbdb'])
-    @retry_with_exponential_backoff(max_attempts=3, retry_exceptions=(Exception,))
-    @fallback_on_error(fallback_func=lambda self, designation: self._create_fallback_asteroid(designation))
-    async def _fetch_with_astroquery(self, designation: str) -> Optional[Dict[str, Any]]:
-        """Асинхронный запрос через astroquery для одного астероида"""
-        loop = asyncio.get_event_loop()
+    @staticmethod
+    def _to_float_column(values: List[Any]) -> List[Optional[float]]:
+        """Приводит колонку к float; пустые и некорректные значения становятся None"""
         try:
-            from astroquery.jplsbdb import SBDB
-
-            def sync_query():
-                try:
-                    result = SBDB.query(designation, phys=True, full_precision=True)
-                except Exception:
-                    result = SBDB.query(designation, full_precision=False)
-
-                if not result or 'object' not in result:
-                    return None
-
-                return self._parse_astroquery_result(result, designation)
-
-            # Выполняем синхронный вызов в пуле потоков
-            result = await loop.run_in_executor(self.executor, sync_query)
-            return result
-
-        except Exception as e:
-            logger.error(f"Astroquery ошибка для {designation}: {e}")
-            raise NetworkError(f"Ошибка при запросе астероида {designation}: {e}")
-
-    def _parse_astroquery_result(self, data: Dict, designation: str) -> Dict[str, Any]:
-        """Парсит результат astroquery в формат AsteroidModel"""
+            column = np.asarray(values, dtype=np.float64)
+        except (ValueError, TypeError):
+            # Значения с единицами измерения остаются строками для _extract_astro_value
+            return values
+        return np.where(np.isnan(column), None, column).tolist()
+
+    def _parse_sbdb_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Парсит строку ответа sbdb_query.api в формат AsteroidModel"""
+        designation = row['pdes']
         try:
-            obj = data.get('object', {})
-            orbit = data.get('orbit', {})
-            phys_par = data.get('phys_par', {})
-            
-            name = self._extract_asteroid_name(obj.get('fullname', ''))
-            perihelion_au, aphelion_au = self._extract_orbital_elements(orbit)
-            earth_moid_au = self._extract_earth_moid(orbit)
+            name = self._extract_asteroid_name(row.get('full_name') or '')
+            perihelion_au, aphelion_au = self._extract_orbital_elements(row)
+            earth_moid_au = self._extract_earth_moid(row)
             
-            h_mag = self._extract_absolute_magnitude(phys_par, obj, designation)
-            albedo, has_albedo_data = self._extract_albedo(phys_par, obj)
+            h_mag = self._extract_absolute_magnitude(row, {}, designation)
+            albedo, has_albedo_data = self._extract_albedo(row, {})
             diameter_km, diameter_source, accurate_diameter = self._extract_diameter(
-                phys_par, obj, h_mag, albedo, has_albedo_data
+                row, {}, h_mag, albedo, has_albedo_data
             )
             
-            orbit_class_info = obj.get('orbit_class', {})
-            orbit_class = orbit_class_info.get('name', '') if orbit_class_info else ''
+            # В ответе приходит код класса орбиты, в базе хранится его название
+            orbit_class_code = row.get('class') or ''
+            orbit_class = ORBIT_CLASS_NAMES.get(orbit_class_code, orbit_class_code)
             
             return {
                 'designation': designation,
@@ -207,30 +150,27 @@ class NASASBDBClient:
                 'accurate_diameter': accurate_diameter,
                 'albedo': albedo,
                 'orbit_class': orbit_class,
-                'orbit_id': orbit.get('orbit_id'),
+                'orbit_id': row.get('orbit_id'),
                 'diameter_source': diameter_source,
             }
             
         except Exception as e:
-            logger.error(f"Ошибка парсинга astroquery для {designation}: {e}")
+            logger.error(f"Ошибка парсинга данных SBDB для {designation}: {e}")
             return self._create_fallback_asteroid(designation)
     
     def _extract_asteroid_name(self, fullname: str) -> Optional[str]:
         """Извлекает имя астероида из полного названия"""
         if not fullname:
             return None
-            
-        parts = fullname.split('(')
-        if len(parts) > 1:
-            name_part = parts[0].strip()
-            if name_part and not name_part.replace(' ', '').isdigit():
-                return name_part
-        return None
+        
+        # Имя - текст до первой скобки, если он не состоит только из номера
+        match = _NAME_RE.match(fullname)
+        return match.group(1) if match else None
     
     def _extract_orbital_elements(self, orbit: Dict) -> tuple:
         """Извлекает перигелий и афелий из орбитальных данных"""
         def find_value(key: str):
-            elements = orbit.get('elements', {})
+            elements = orbit.get('elements', orbit)
             if isinstance(elements, dict):
                 return self._extract_astro_value(elements.get(key))
             elif isinstance(elements, list):
@@ -309,37 +249,12 @@ class NASASBDBClient:
         for source in diameter_sources:
             extracted = self._extract_astro_value(source)
             if extracted is not None and extracted > 0:
-                diameter_is_measured = self._is_diameter_measured(phys_par)
-                diameter_source = 'measured' if diameter_is_measured else 'computed'
-                accurate_diameter = diameter_is_measured
-                return extracted, diameter_source, accurate_diameter
+                # sbdb_query.api не отдаёт ссылку на источник диаметра, а поле diameter
+                # заполняется только опубликованными измерениями - считаем его измеренным
+                return extracted, 'measured', True
         
         return self._calculate_diameter(h_mag, albedo, has_albedo_data), 'calculated', False
     
-    def _is_diameter_measured(self, phys_par: Dict) -> bool:
-        """Определяет, является ли диаметр измеренным или вычисленным"""
-        diameter_ref = phys_par.get('diameter_ref', '')
-        diameter_note = phys_par.get('diameter_note', '')
-        ref_note = f"{diameter_ref} {diameter_note}".lower()
-        
-        measured_keywords = [
-            'radar', 'IRAS', 'WISE', 'NEOWISE', 'Spitzer', 
-            'thermal', 'occultation', 'adaptive optics',
-            'HST', 'Hubble', 'Keck', 'VLT', 'Arecibo'
-        ]
-        
-        computed_keywords = [
-            'assumed', 'assumed albedo', 'typical', 'standard',
-            'default', 'estimated from', 'derived from'
-        ]
-        
-        if any(keyword in ref_note for keyword in measured_keywords):
-            return True
-        elif any(keyword in ref_note for keyword in computed_keywords):
-            return False
-        
-        return True
-    
     def _calculate_diameter(self, h_mag: float, albedo: float, has_albedo_data: bool) -> float:
         """Вычисляет диаметр на основе H-величины и альбедо"""
         try:
@@ -363,26 +278,16 @@ class NASASBDBClient:
                 return float(value)
             
             if isinstance(value, dict):
-                for key in ['value', 'est', 'val', 'mean']:
-                    if key in value and value[key] is not None:
-                        return self._extract_astro_value(value[key])
+                for key in ('value', 'est', 'val', 'mean'):
+                    inner = value.get(key)
+                    if inner is not None:
+                        # Числовой лист возвращается сразу, без рекурсивного вызова
+                        if isinstance(inner, (int, float)):
+                            return float(inner)
+                        return self._extract_astro_value(inner)
             
             if isinstance(value, str):
-                clean = value.strip().lower()
-                number_pattern = r'[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?'
-                numbers = re.findall(number_pattern, clean)
-                
-                if numbers:
-                    main_value = float(numbers[0])
-                    
-                    if 'km' in clean and 'm' not in clean.replace('km', ''):
-                        return main_value
-                    elif 'm' in clean and 'km' not in clean.replace('m', ''):
-                        return main_value / 1000
-                    elif 'au' in clean:
-                        return main_value * 149597870.7
-                    else:
-                        return main_value
+                return self._parse_numeric_string(value)
             
             if isinstance(value, (list, tuple)) and len(value) > 0:
                 return self._extract_astro_value(value[0])
@@ -392,6 +297,35 @@ class NASASBDBClient:
         
         return None
     
+    @staticmethod
+    def _parse_numeric_string(value: str) -> Optional[float]:
+        """Разбирает число из строки с учетом единиц измерения (km, m, au)"""
+        clean = value.strip().lower()
+
+        # Быстрый путь: строка без единиц - обычное число, регулярное выражение не нужно
+        if clean and _PLAIN_NUMBER_CHARS.issuperset(clean):
+            try:
+                return float(clean)
+            except ValueError:
+                pass
+
+        match = _NUM_RE.search(clean)
+        if not match:
+            return None
+
+        main_value = float(match.group(0))
+
+        # Единицы определяются подсчетом вхождений, без промежуточных строк от replace
+        m_count = clean.count('m')
+        if m_count and m_count == clean.count('km'):
+            return main_value
+        elif m_count:
+            return main_value / 1000
+        elif 'au' in clean:
+            return main_value * 149597870.7
+        else:
+            return main_value
+
     def _create_fallback_asteroid(self, designation: str) -> Dict[str, Any]:
         """Создает минимальные данные об астероиде при ошибке парсинга"""
         return {
@@ -410,11 +344,16 @@ class NASASBDBClient:
     
     def _log_diameter_statistics(self, results: List[Dict[str, Any]]) -> None:
         """Логирует статистику по диаметрам астероидов"""
-        accurate_count = sum(1 for a in results if a.get('accurate_diameter', False))
-        measured_count = sum(1 for a in results if a.get('diameter_source') == 'measured')
-        computed_count = sum(1 for a in results if a.get('diameter_source') == 'computed')
-        calculated_count = sum(1 for a in results if a.get('diameter_source') == 'calculated')
         total = len(results)
+        if not total:
+            return
+
+        # Источники диаметра считаются одним проходом Counter вместо трех отдельных sum()
+        source_counts = Counter(a.get('diameter_source') for a in results)
+        accurate_count = sum(1 for a in results if a.get('accurate_diameter', False))
+        measured_count = source_counts['measured']
+        computed_count = source_counts['computed']
+        calculated_count = source_counts['calculated']
 
         logger.info(f"Статистика по диаметрам:")
         logger.info(f"  Всего астероидов: {total}")
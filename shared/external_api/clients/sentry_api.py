@@ -1,17 +1,68 @@
 import logging
+import math
+import time
 import aiohttp
-from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass, asdict
-from datetime import datetime
+import orjson
+from bisect import bisect_right
+from typing import Callable, Dict, List, Any, Optional, Tuple
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from pydantic import BaseModel, validator
 from shared.utils.error_handlers import nasa_api_endpoint, validate_response, log_execution_time
+from shared.utils.torino import THREAT_LEVEL_BY_TORINO
 from shared.resilience import circuit_breaker, NASA_API_CIRCUIT_CONFIG, bulkhead, SENTRY_BULKHEAD_CONFIG, timeout, NASA_API_TIMEOUTS
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Туринская шкала на русском, индекс - значение шкалы (0..10)
+TORINO_SCALE_RU = (
+    "0 — Нет риска (зелёный)",
+    "1 — Нормальный (зелёный)",
+    "2 — Заслуживает внимания (жёлтый)",
+    "3 — Заслуживает внимания (оранжевый)",
+    "4 — Заслуживает внимания (оранжевый)",
+    "5 — Серьёзная угроза (красный)",
+    "6 — Серьёзная угроза (красный)",
+    "7 — Серьёзная угроза (красный)",
+    "8 — Столкновение неизбежно (красный)",
+    "9 — Столкновение неизбежно (красный)",
+    "10 — Столкновение неизбежно (красный)",
+)
+
+def _float_to_int(value: Any) -> int:
+    """Приводит значение к int через float, чтобы принимать строки вида '22.5'"""
+    return int(float(value))
+
+def _cast_or_default(cast: Callable[[Any], Any], value: Any, key: str, default: Any) -> Any:
+    """Приводит значение поля Sentry к нужному типу; при ошибке возвращает значение по умолчанию"""
+    try:
+        return cast(value)
+    except (ValueError, TypeError, OverflowError):
+        logger.debug(f"Не удалось преобразовать '{value}' для ключа '{key}'. Используется значение по умолчанию {default}.")
+        return default
+
+# Числовые поля объекта Sentry: (ключ, приведение, значение по умолчанию)
+SENTRY_NUMERIC_FIELDS = (
+    ('ip', float, 0.0),
+    ('ts_max', _float_to_int, 0),
+    ('ps_max', float, -10.0),
+    ('diameter', float, 0.05),
+    ('v_inf', float, 20.0),
+    ('h', float, 22.0),
+)
+
+# Пороги вероятности и шаблоны текста: шаблон с индексом i - для вероятностей от порога i-1 до порога i
+PROBABILITY_THRESHOLDS = (1e-6, 1e-4, 0.01)
+PROBABILITY_TEMPLATES = (
+    "{probability:.2e} (чрезвычайно малая вероятность, 1 к {odds})",
+    "{percent:.6f}% (1 к {odds})",
+    "{percent:.4f}% (1 к {odds})",
+    "{percent:.2f}% (1 к {odds})",
+)
+
+@dataclass(slots=True, frozen=True)
 class SentryImpactRisk:
-    """Данные об объекте с риском столкновения из системы NASA Sentry"""
+    """Данные об объекте с риском столкновения из системы NASA Sentry; неизменяемы, так как раздаются из общего кеша"""
     designation: str
     fullname: str
     ip: float
@@ -21,7 +72,7 @@ class SentryImpactRisk:
     v_inf: float
     h: float
     n_imp: int
-    impact_years: List[int]
+    impact_years: Tuple[int, ...]
     last_obs: str
     threat_level_ru: str
     torino_scale_ru: str
@@ -30,7 +81,10 @@ class SentryImpactRisk:
     
     def to_dict(self) -> Dict[str, Any]:
         """Преобразует объект в словарь"""
-        return asdict(self)
+        # Плоский обход слотов вместо рекурсивного копирования asdict; копируется только список лет
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data['impact_years'] = list(self.impact_years)
+        return data
     
 # Добавить модель валидации ответа Sentry
 class SentryAPIResponse(BaseModel):
@@ -51,24 +105,37 @@ class SentryClient:
     """Асинхронный клиент для получения данных о рисках столкновений"""
     
     SENTRY_API_URL = "https://ssd-api.jpl.nasa.gov/sentry.api"
+    # Данные Sentry меняются раз в несколько дней; список рисков кешируется на уровне класса
+    RISKS_CACHE_TTL = 3600
+    _risks_cache: Optional[Tuple[float, Tuple[SentryImpactRisk, ...]]] = None
     
-    def __init__(self, timeout: int = 30):
+    def __init__(self, timeout: int = 30, session: Optional[aiohttp.ClientSession] = None):
+        """session: внешняя сессия для повторного использования соединений; клиент ее не закрывает"""
         self.timeout = timeout
-        self.session: Optional[aiohttp.ClientSession] = None
+        self.session: Optional[aiohttp.ClientSession] = session
+        self._owns_session = session is None
         
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Сбрасывает закешированный список рисков; следующий запрос обратится к Sentry API"""
+        cls._risks_cache = None
+
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=self.timeout),
-            headers={
-                'User-Agent': 'AsteroidWatchBot/1.0',
-                'Accept': 'application/json'
-            }
-        )
+        if self._owns_session:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=20, keepalive_timeout=75),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={
+                    'User-Agent': 'AsteroidWatchBot/1.0',
+                    'Accept': 'application/json'
+                }
+            )
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
+        if self._owns_session and self.session:
             await self.session.close()
+            self.session = None
     
     @circuit_breaker(NASA_API_CIRCUIT_CONFIG)
     @bulkhead(SENTRY_BULKHEAD_CONFIG)
@@ -80,13 +147,18 @@ class SentryClient:
         """Получает все актуальные риски столкновений с ts_max > 0"""
         if not self.session:
             raise RuntimeError("Сессия не инициализирована. Используйте контекстный менеджер.")
+
+        cached = SentryClient._risks_cache
+        if cached and cached[0] > time.monotonic():
+            logger.info(f"Используются закешированные риски Sentry: {len(cached[1])} объектов")
+            return list(cached[1])
             
         logger.info("Запрос актуальных данных о рисках из NASA Sentry API...")
         params = {'ip-min': '1e-10'}
         
         async with self.session.get(self.SENTRY_API_URL, params=params) as response:
             response.raise_for_status()
-            raw_data = await response.json()
+            raw_data = orjson.loads(await response.read())
             
             # Валидация структуры ответа
             try:
@@ -95,10 +167,12 @@ class SentryClient:
                 logger.error(f"Invalid Sentry API response structure: {e}")
                 return []
             
+            # Одна отметка времени на весь ответ вместо вызова datetime.now() на каждый объект
+            now = datetime.now(timezone.utc)
             risks = []
             for item in validated_data.data:
                 try:
-                    risk = self._parse_sentry_item(item)
+                    risk = self._parse_sentry_item(item, now)
                     if risk.ts_max > 0:
                         risks.append(risk)
                 except Exception as e:
@@ -106,7 +180,8 @@ class SentryClient:
                     continue
                     
             logger.info(f"Найдено {len(risks)} объектов с ts_max > 0")
-            return risks
+            SentryClient._risks_cache = (time.monotonic() + self.RISKS_CACHE_TTL, tuple(risks))
+            return list(risks)
     
     @circuit_breaker(NASA_API_CIRCUIT_CONFIG)
     @bulkhead(SENTRY_BULKHEAD_CONFIG)
@@ -119,14 +194,14 @@ class SentryClient:
             raise RuntimeError("Сессия не инициализирована. Используйте контекстный менеджер.")
             
         try:
-            url = f"{self.SENTRY_API_URL}?des={designation}"
-            async with self.session.get(url) as response:
+            # Параметры передаются через params: обозначения вида '2023 DW' требуют кодирования
+            async with self.session.get(self.SENTRY_API_URL, params={'des': designation}) as response:
                 if response.status == 404:
                     logger.info(f"Объект {designation} не найден в Sentry API.")
                     return None
                     
                 response.raise_for_status()
-                data = await response.json()
+                data = orjson.loads(await response.read())
                 
                 if 'error' in data or not data.get('data'):
                     return None
@@ -139,33 +214,30 @@ class SentryClient:
             logger.error(f"Ошибка при запросе объекта {designation}: {e}")
             return None
             
-    def _parse_sentry_item(self, item: Dict[str, Any]) -> SentryImpactRisk:
-        """Парсит элемент данных из Sentry API в объект SentryImpactRisk"""
+    def _parse_sentry_item(self, item: Dict[str, Any], now: Optional[datetime] = None) -> SentryImpactRisk:
+        """Парсит элемент данных из Sentry API в объект SentryImpactRisk; now - время получения ответа"""
         # Безопасное извлечение данных с правильными типами
         designation = self._safe_extract_str(item, 'des', 'Неизвестно')
         fullname = self._safe_extract_str(item, 'fullname', designation)
         last_obs = self._safe_extract_str(item, 'last_obs', 'Неизвестно')
         
-        # Извлечение числовых значений
-        ip = self._safe_extract_float(item, 'ip', 0.0)
+        # Извлечение числовых значений одним проходом по описанию полей
+        ip, ts_max, ps_max, diameter, v_inf, h_mag = [
+            default if (value := item.get(key)) is None else _cast_or_default(cast, value, key, default)
+            for key, cast, default in SENTRY_NUMERIC_FIELDS
+        ]
         
-        ts_max = self._safe_extract_int(item, 'ts_max', 0)
         if ts_max == 0:
             ts_cum = self._safe_extract_int(item, 'ts', 0)  # Попытка получить cumulative
             if ts_cum != 0:
                 logger.debug(f"Для объекта {designation} используется ts_cum={ts_cum}, так как ts_max=0")
         
-        ps_max = self._safe_extract_float(item, 'ps_max', -10.0)
         if ps_max <= -10.0:  # Значение по умолчанию, возможно поле отсутствует
             ps_cum = self._safe_extract_float(item, 'ps', -10.0)
             if ps_cum > -10.0:
                 ps_max = ps_cum
                 logger.debug(f"Для объекта {designation} используется ps_cum={ps_cum} как ps_max")
         
-        diameter = self._safe_extract_float(item, 'diameter', 0.05)
-        v_inf = self._safe_extract_float(item, 'v_inf', 20.0)
-        h_mag = self._safe_extract_float(item, 'h', 22.0)
-        
         n_imp, impact_years = self._extract_impact_scenarios(item.get('data', []))
         
         # Локализация данных
@@ -188,7 +260,7 @@ class SentryClient:
             threat_level_ru=threat_level_ru,
             torino_scale_ru=torino_scale_ru,
             impact_probability_text_ru=impact_probability_text_ru,
-            last_update=datetime.now()
+            last_update=now or datetime.now(timezone.utc)
         )
     
     def _safe_extract_str(self, item: Dict, key: str, default: str) -> str:
@@ -201,57 +273,28 @@ class SentryClient:
     def _safe_extract_float(self, item: Dict, key: str, default: float) -> float:
         """Безопасно извлекает и преобразует значение в float"""
         value = item.get(key)
-        if value is None:
-            return default
-        try:
-            return float(value)
-        except (ValueError, TypeError):
-            logger.debug(f"Не удалось преобразовать '{value}' в float для ключа '{key}'. Используется значение по умолчанию {default}.")
-            return default
+        return default if value is None else _cast_or_default(float, value, key, default)
     
     def _safe_extract_int(self, item: Dict, key: str, default: int) -> int:
         """Безопасно извлекает и преобразует значение в int"""
         value = item.get(key)
-        if value is None:
-            return default
-        try:
-            return int(float(value))  # Сначала в float если строка "22.5"
-        except (ValueError, TypeError):
-            logger.debug(f"Не удалось преобразовать '{value}' в int для ключа '{key}'. Используется значение по умолчанию {default}.")
-            return default
+        return default if value is None else _cast_or_default(_float_to_int, value, key, default)
     
-    def _extract_impact_scenarios(self, impact_data: List[Dict]) -> Tuple[int, List[int]]:
+    def _extract_impact_scenarios(self, impact_data: List[Dict]) -> Tuple[int, Tuple[int, ...]]:
         """Извлекает информацию о сценариях столкновений"""
-        impact_years = []
-        
-        for impact in impact_data:
-            date_str = impact.get('date', '')
-            if date_str and len(date_str) >= 4:
-                try:
-                    year = int(date_str[:4])
-                    impact_years.append(year)
-                except ValueError:
-                    continue
-        # Удаляем дубликаты и сортируем
-        unique_years = sorted(set(impact_years))
-        return len(impact_data), unique_years
+        # Год - первые 4 символа даты; проверка isdigit вместо перехвата ValueError на каждой строке
+        impact_years = {
+            int(year)
+            for year in (str(impact.get('date') or '')[:4] for impact in impact_data)
+            if len(year) == 4 and year.isdigit()
+        }
+        return len(impact_data), tuple(sorted(impact_years))
         
     def _translate_torino_scale(self, ts_value: int) -> str:
         """Переводит значение Туринской шкалы на русский язык"""
-        translations = {
-            0: "0 — Нет риска (зелёный)",
-            1: "1 — Нормальный (зелёный)",
-            2: "2 — Заслуживает внимания (жёлтый)",
-            3: "3 — Заслуживает внимания (оранжевый)",
-            4: "4 — Заслуживает внимания (оранжевый)",
-            5: "5 — Серьёзная угроза (красный)",
-            6: "6 — Серьёзная угроза (красный)",
-            7: "7 — Серьёзная угроза (красный)",
-            8: "8 — Столкновение неизбежно (красный)",
-            9: "9 — Столкновение неизбежно (красный)",
-            10: "10 — Столкновение неизбежно (красный)"
-        }
-        return translations.get(ts_value, f"{ts_value} — Неизвестное значение")
+        if 0 <= ts_value < len(TORINO_SCALE_RU):
+            return TORINO_SCALE_RU[ts_value]
+        return f"{ts_value} — Неизвестное значение"
         
     def _assess_threat_level(self, ts_max: int, ps_max: float, ip: float) -> str:
         """Оценивает уровень угрозы на основе шкал Турина и Палермо.[citation:4]"""
@@ -260,38 +303,21 @@ class SentryClient:
                 return "НУЛЕВОЙ (ниже фонового уровня)"
             else:
                 return "ОЧЕНЬ НИЗКИЙ"
-        elif 1 <= ts_max <= 4:
-            return "НИЗКИЙ (требует наблюдения)"
-        elif ts_max == 5:
-            return "СРЕДНИЙ (заслуживает внимания астрономов)"
-        elif ts_max == 6:
-            return "ПОВЫШЕННЫЙ (серьёзная угроза)"
-        elif ts_max == 7:
-            return "ВЫСОКИЙ (очень серьёзная угроза)"
-        elif ts_max >= 8:
+        elif 1 <= ts_max < len(THREAT_LEVEL_BY_TORINO):
+            return THREAT_LEVEL_BY_TORINO[ts_max]
+        elif ts_max >= len(THREAT_LEVEL_BY_TORINO):
             return "КРИТИЧЕСКИЙ (непосредственная угроза)"
         else:
             return "НЕОПРЕДЕЛЕН"
             
     def _format_probability_text(self, probability: float) -> str:
         """Форматирует вероятность в читаемый русский текст"""
-        if probability <= 0:
+        if not probability > 0:
             return "Вероятность отсутствует"
-        # Защита от деления на ноль
-        if probability > 0:
-            try:
-                odds = int(1/probability)
-                odds_formatted = f"{odds:,}".replace(",", " ")
-            except (ZeroDivisionError, ValueError, OverflowError):
-                odds_formatted = "очень большое"
-        else:
-            odds_formatted = "N/A"
-            
-        if probability >= 0.01:  # 1% и выше
-            return f"{probability*100:.2f}% (1 к {odds_formatted})"
-        elif probability >= 1e-4:  # 0.01% и выше
-            return f"{probability*100:.4f}% (1 к {odds_formatted})"
-        elif probability >= 1e-6:  # 0.0001% и выше
-            return f"{probability*100:.6f}% (1 к {odds_formatted})"
-        else:
-            return f"{probability:.2e} (чрезвычайно малая вероятность, 1 к {odds_formatted})"
\ No newline at end of file
+
+        odds = 1 / probability
+        odds_formatted = "очень большое" if math.isinf(odds) else format(int(odds), '_').replace('_', ' ')
+
+        # Шаблон выбирается бинарным поиском по порогам вместо цепочки сравнений
+        template = PROBABILITY_TEMPLATES[bisect_right(PROBABILITY_THRESHOLDS, probability)]
+        return template.format(probability=probability, percent=probability * 100, odds=odds_formatted)
\ No newline at end of file
@@ -20,11 +20,10 @@ async def get_current_close_approaches(
             logger.warning("Пустой список астероидов для получения сближений")
             return []
 
-        designations = []
-        for asteroid in asteroids:
-            designation = asteroid.get('designation')
-            if designation and designation not in designations:
-                designations.append(designation)
+        # dict.fromkeys убирает дубликаты за O(n) с сохранением порядка
+        designations = list(dict.fromkeys(
+            asteroid['designation'] for asteroid in asteroids if asteroid.get('designation')
+        ))
 
         if not designations:
             logger.warning("Нет валидных обозначений астероидов")
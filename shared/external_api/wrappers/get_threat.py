@@ -53,7 +53,7 @@ def _impact_risk_to_dict(risk: SentryImpactRisk) -> Dict[str, Any]:
         'velocity_km_s': risk.v_inf,
         'absolute_magnitude': risk.h,
         'n_imp': risk.n_imp,
-        'impact_years': risk.impact_years,
+        'impact_years': list(risk.impact_years),
         'last_obs': risk.last_obs,
         'threat_level_ru': risk.threat_level_ru,
         'torino_scale_ru': risk.torino_scale_ru,
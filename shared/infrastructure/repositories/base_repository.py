@@ -6,6 +6,7 @@ import logging
 import time
 
 from shared.models.base import Base
+from shared.transaction.uow import get_current_uow
 from shared.utils.datetime_utils import normalize_datetime
 
 ModelType = TypeVar('ModelType', bound=Base)
@@ -20,7 +21,8 @@ def handle_repository_errors(default_return=None):
                 return await func(self, *args, **kwargs)
             except Exception as e:
                 import os
-                if os.getenv('PYTEST_CURRENT_TEST'):
+                # В транзакции запроса API ошибку откатывает его UnitOfWork, а не репозиторий
+                if os.getenv('PYTEST_CURRENT_TEST') or not self._owns_transaction():
                     raise
                 logger.error(
                     f"Ошибка в методе {func.__name__} репозитория {self.__class__.__name__}: {e}",
@@ -34,6 +36,9 @@ def handle_repository_errors(default_return=None):
 class BaseRepository(Generic[ModelType]):
     """Базовый класс репозитория с CRUD-операциями"""
 
+    # Строк в одном INSERT: PostgreSQL допускает не больше 32767 параметров на запрос
+    BULK_CHUNK_SIZE = 1000
+
     def __init__(self, model: Type[ModelType]):
         """Инициализация репозитория с моделью"""
         self.model = model
@@ -104,6 +109,10 @@ class BaseRepository(Generic[ModelType]):
         else:
             raise ValueError("No session available for delete operation")
 
+    def _load_options(self) -> list:
+        """Опции загрузки связей для запросов чтения (переопределяется в наследниках)"""
+        return []
+
     @property
     def _unique_fields(self):
         """Определяет уникальные поля модели (кешируется)"""
@@ -126,6 +135,24 @@ class BaseRepository(Generic[ModelType]):
         """Setter for _unique_fields to support testing"""
         self._cached_unique_fields = value
     
+    def _owns_transaction(self) -> bool:
+        """False, если сессия принадлежит UnitOfWork запроса API (request_scope)"""
+        uow = get_current_uow()
+        return uow is None or uow.session is not self.session
+
+    async def _commit(self) -> None:
+        """Коммит собственной транзакции; в транзакции запроса только flush, коммитит UnitOfWork"""
+        if self._owns_transaction():
+            await self.session.commit()
+        else:
+            await self.session.flush()
+
+    async def _rollback(self, error: Exception) -> None:
+        """Откат собственной транзакции; в транзакции запроса ошибка передаётся UnitOfWork"""
+        if not self._owns_transaction():
+            raise error
+        await self.session.rollback()
+
     @handle_repository_errors(default_return=None)
     async def create(self, data: Dict[str, Any]) -> ModelType:
         """Создает новую запись в базе данных и выполняет коммит"""
@@ -141,20 +168,20 @@ class BaseRepository(Generic[ModelType]):
             self.session.add(instance)
             await self.session.flush()
             await self.session.refresh(instance)
-            await self.session.commit()
+            await self._commit()
 
             logger.info(f"Создана запись {self.model.__name__} с ID {instance.id}")
             return instance
 
         except Exception as e:
-            await self.session.rollback()
+            await self._rollback(e)
             logger.error(f"Ошибка создания записи {self.model.__name__}: {e}")
             raise
     
     @handle_repository_errors(default_return=None)
     async def get_by_id(self, id: int) -> Optional[ModelType]:
         """Получает запись по её ID. Без коммита (чтение)"""
-        query = select(self.model).where(self.model.id == id)
+        query = select(self.model).options(*self._load_options()).where(self.model.id == id)
         result = await self.session.execute(query)
         instance = result.scalar_one_or_none()
 
@@ -184,13 +211,13 @@ class BaseRepository(Generic[ModelType]):
 
             await self.session.flush()
             await self.session.refresh(instance)
-            await self.session.commit()
+            await self._commit()
 
             logger.info(f"Обновлена запись {self.model.__name__} с ID {id}")
             return instance
 
         except Exception as e:
-            await self.session.rollback()
+            await self._rollback(e)
             logger.error(f"Ошибка обновления записи {self.model.__name__} с ID {id}: {e}")
             raise
 
@@ -205,13 +232,13 @@ class BaseRepository(Generic[ModelType]):
 
             await self.session.delete(instance)
             await self.session.flush()
-            await self.session.commit()
+            await self._commit()
 
             logger.info(f"Удалена запись {self.model.__name__} с ID {id}")
             return True
 
         except Exception as e:
-            await self.session.rollback()
+            await self._rollback(e)
             logger.error(f"Ошибка удаления записи {self.model.__name__} с ID {id}: {e}")
             raise
 
@@ -222,7 +249,7 @@ class BaseRepository(Generic[ModelType]):
         limit: Optional[int] = 100
     ) -> List[ModelType]:
         """Получает все записи с пагинацией. Без коммита (чтение)"""
-        query = select(self.model).offset(skip)
+        query = select(self.model).options(*self._load_options()).offset(skip)
         if limit:
             query = query.limit(limit)
 
@@ -252,7 +279,54 @@ class BaseRepository(Generic[ModelType]):
         order_desc: bool = False
     ) -> List[ModelType]:
         """Универсальный метод фильтрации записей. Без коммита (чтение)"""
-        query = select(self.model)
+        query = self._build_filter_query(select(self.model), filters, order_by, order_desc)
+
+        query = query.offset(skip)
+        if limit:
+            query = query.limit(limit)
+
+        result = await self.session.execute(query)
+        return result.scalars().all()
+
+    @handle_repository_errors(default_return=([], 0))
+    async def filter_with_total(
+        self,
+        filters: Dict[str, Any],
+        skip: int = 0,
+        limit: Optional[int] = 100,
+        order_by: Optional[str] = None,
+        order_desc: bool = False
+    ) -> Tuple[List[ModelType], int]:
+        """Фильтрация с общим количеством записей за один запрос (COUNT(*) OVER()). Без коммита (чтение)"""
+        query = self._build_filter_query(
+            select(self.model, func.count().over().label("total")),
+            filters, order_by, order_desc
+        )
+
+        query = query.offset(skip)
+        if limit:
+            query = query.limit(limit)
+
+        result = await self.session.execute(query)
+        rows = result.all()
+
+        if rows:
+            return [row[0] for row in rows], rows[0][1]
+
+        if skip == 0:
+            return [], 0
+
+        # Страница за пределами выборки - общее количество считаем отдельно
+        count_query = select(func.count()).select_from(self.model)
+        conditions = self._build_filter_conditions(filters)
+        if conditions:
+            count_query = count_query.where(and_(*conditions))
+        total = (await self.session.execute(count_query)).scalar()
+        return [], total or 0
+
+    def _build_filter_query(self, query, filters: Dict[str, Any], order_by: Optional[str], order_desc: bool):
+        """Добавляет к запросу опции загрузки, условия фильтрации и сортировку"""
+        query = query.options(*self._load_options())
 
         conditions = self._build_filter_conditions(filters)
         if conditions:
@@ -261,15 +335,11 @@ class BaseRepository(Generic[ModelType]):
         if order_by:
             field = getattr(self.model, order_by, None)
             if field:
-                query = query.order_by(field.desc() if order_desc else field)
+                # id как вторичный ключ делает постраничную выборку детерминированной
+                query = query.order_by(field.desc() if order_desc else field, self.model.id)
 
-        query = query.offset(skip)
-        if limit:
-            query = query.limit(limit)
+        return query
 
-        result = await self.session.execute(query)
-        return result.scalars().all()
-    
     def _build_filter_conditions(self, filters: Dict[str, Any]) -> list:
         """Преобразует словарь фильтров в условия SQLAlchemy"""
         conditions = []
@@ -345,7 +415,7 @@ class BaseRepository(Generic[ModelType]):
                 return await self._bulk_create_generic(data_list, conflict_action, conflict_fields)
 
         except Exception as e:
-            await self.session.rollback()
+            await self._rollback(e)
             logger.error(f"Ошибка массового создания записей {self.model.__name__}: {e}")
             raise
         finally:
@@ -357,35 +427,37 @@ class BaseRepository(Generic[ModelType]):
         data_list: List[Dict[str, Any]],
         conflict_fields: List[str]
     ) -> Tuple[int, int]:
-        """Оптимизированная версия для PostgreSQL с ON CONFLICT DO UPDATE"""
+        """Оптимизированная версия для PostgreSQL с ON CONFLICT DO UPDATE. Пачки по BULK_CHUNK_SIZE строк, один коммит"""
         try:
             filtered_data_list = []
             for data in data_list:
                 filtered_data = {k: v for k, v in data.items() if k in self._model_columns}
                 filtered_data_list.append(filtered_data)
 
-            stmt = pg_insert(self.model).values(filtered_data_list)
+            total_processed = 0
+            for i in range(0, len(filtered_data_list), self.BULK_CHUNK_SIZE):
+                stmt = pg_insert(self.model).values(filtered_data_list[i:i + self.BULK_CHUNK_SIZE])
 
-            update_dict = {}
-            for column in self._model_columns:
-                if column not in conflict_fields and column != 'id':
-                    update_dict[column] = getattr(stmt.excluded, column)
+                update_dict = {}
+                for column in self._model_columns:
+                    if column not in conflict_fields and column not in ('id', 'created_at'):
+                        update_dict[column] = getattr(stmt.excluded, column)
 
-            stmt = stmt.on_conflict_do_update(
-                index_elements=conflict_fields,
-                set_=update_dict
-            )
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=conflict_fields,
+                    set_=update_dict
+                )
 
-            result = await self.session.execute(stmt)
-            await self.session.commit()
+                result = await self.session.execute(stmt)
+                total_processed += result.rowcount
 
-            total_processed = result.rowcount
+            await self._commit()
 
             logger.info(f"PostgreSQL bulk create обработал {total_processed} записей")
             return total_processed, 0
 
         except Exception as e:
-            await self.session.rollback()
+            await self._rollback(e)
             raise
 
     async def _bulk_create_generic(
@@ -404,7 +476,7 @@ class BaseRepository(Generic[ModelType]):
                     self.session.add(instance)
                     created += 1
 
-                await self.session.commit()
+                await self._commit()
                 return created, 0
 
             created = 0
@@ -430,12 +502,12 @@ class BaseRepository(Generic[ModelType]):
                     self.session.add(instance)
                     created += 1
 
-            await self.session.commit()
+            await self._commit()
             logger.info(f"Bulk создание завершено. Создано: {created}, Обновлено: {updated}")
             return created, updated
 
         except Exception as e:
-            await self.session.rollback()
+            await self._rollback(e)
             raise
     
     async def _find_by_fields(
@@ -443,7 +515,7 @@ class BaseRepository(Generic[ModelType]):
         fields: Dict[str, Any]
     ) -> Optional[ModelType]:
         """Ищет запись по указанным полям. Без коммита (чтение)"""
-        query = select(self.model)
+        query = select(self.model).options(*self._load_options())
         conditions = []
 
         for field_name, value in fields.items():
@@ -482,7 +554,7 @@ class BaseRepository(Generic[ModelType]):
         if not conditions:
             return []
 
-        query = select(self.model).where(or_(*conditions))
+        query = select(self.model).options(*self._load_options()).where(or_(*conditions))
 
         query = query.offset(skip)
         if limit:
@@ -505,13 +577,13 @@ class BaseRepository(Generic[ModelType]):
                 await self.session.delete(record)
                 deleted_count += 1
 
-            await self.session.commit()
+            await self._commit()
 
             logger.info(f"Удалено {deleted_count} записей {self.model.__name__}")
             return deleted_count
 
         except Exception as e:
-            await self.session.rollback()
+            await self._rollback(e)
             logger.error(f"Ошибка массового удаления: {e}")
             raise
         
\ No newline at end of file
@@ -3,16 +3,22 @@ from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
 from sqlalchemy import inspect
 from decimal import Decimal
 from datetime import datetime
+from contextlib import asynccontextmanager
 import logging
 
-from shared.transaction.uow import UnitOfWork
+from shared.transaction.uow import UnitOfWork, get_current_uow
 from shared.infrastructure import BaseRepository
 
 logger = logging.getLogger(__name__)
 
 
 class BaseService:
-    """Базовый сервис для работы с одной конкретной моделью"""
+    """Базовый сервис для работы с одной конкретной моделью.
+
+    session_factory должна быть привязана к движку с AsyncAdaptedQueuePool
+    достаточного размера (см. shared/database/engine.py): каждый вызов вне
+    запроса API занимает отдельное соединение.
+    """
 
     def __init__(self, session_factory: async_sessionmaker[AsyncSession], model_class: Type):
         """Инициализация базового сервиса"""
@@ -22,21 +28,21 @@ class BaseService:
 
     async def create(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Создание записи текущей модели"""
-        async with UnitOfWork(self.session_factory) as uow:
+        async with self._acquire_uow() as uow:
             repo = self._get_repository(uow)
             instance = await repo.create(data)
             return self._model_to_dict(instance) if instance else None
 
     async def get_by_id(self, id: int) -> Optional[Dict[str, Any]]:
         """Получение записи по ID"""
-        async with UnitOfWork(self.session_factory) as uow:
+        async with self._acquire_uow() as uow:
             repo = self._get_repository(uow)
             instance = await repo.get_by_id(id)
             return self._model_to_dict(instance) if instance else None
 
     async def get_by_designation(self, designation: str) -> Optional[Dict[str, Any]]:
         """Получение записи по обозначению (если поддерживается)"""
-        async with UnitOfWork(self.session_factory) as uow:
+        async with self._acquire_uow() as uow:
             repo = self._get_repository(uow)
             if hasattr(repo, 'get_by_designation'):
                 instance = await repo.get_by_designation(designation)
@@ -47,21 +53,21 @@ class BaseService:
 
     async def get_all(self, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
         """Получение всех записей с пагинацией"""
-        async with UnitOfWork(self.session_factory) as uow:
+        async with self._acquire_uow() as uow:
             repo = self._get_repository(uow)
             instances = await repo.get_all(skip, limit)
             return [self._model_to_dict(inst) for inst in instances]
 
     async def update(self, id: int, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Обновление записи"""
-        async with UnitOfWork(self.session_factory) as uow:
+        async with self._acquire_uow() as uow:
             repo = self._get_repository(uow)
             instance = await repo.update(id, data)
             return self._model_to_dict(instance) if instance else None
 
     async def delete(self, id: int) -> bool:
         """Удаление записи"""
-        async with UnitOfWork(self.session_factory) as uow:
+        async with self._acquire_uow() as uow:
             repo = self._get_repository(uow)
             return await repo.delete(id)
 
@@ -74,11 +80,30 @@ class BaseService:
         order_desc: bool = False
     ) -> List[Dict[str, Any]]:
         """Универсальная фильтрация записей"""
-        async with UnitOfWork(self.session_factory) as uow:
+        async with self._acquire_uow() as uow:
             repo = self._get_repository(uow)
             instances = await repo.filter(filters, skip, limit, order_by, order_desc)
             return [self._model_to_dict(inst) for inst in instances]
 
+    async def filter_page(
+        self,
+        filters: Dict[str, Any],
+        skip: int = 0,
+        limit: int = 100,
+        order_by: Optional[str] = None,
+        order_desc: bool = False
+    ) -> Dict[str, Any]:
+        """Фильтрация с возвратом страницы и общего количества записей"""
+        async with self._acquire_uow() as uow:
+            repo = self._get_repository(uow)
+            instances, total = await repo.filter_with_total(filters, skip, limit, order_by, order_desc)
+            return {
+                "items": [self._model_to_dict(inst) for inst in instances],
+                "total": total,
+                "page": skip // limit + 1 if limit else 1,
+                "size": limit
+            }
+
     async def search(
         self,
         search_term: str,
@@ -87,14 +112,14 @@ class BaseService:
         limit: int = 50
     ) -> List[Dict[str, Any]]:
         """Поиск по текстовым полям"""
-        async with UnitOfWork(self.session_factory) as uow:
+        async with self._acquire_uow() as uow:
             repo = self._get_repository(uow)
             instances = await repo.search(search_term, search_fields, skip, limit)
             return [self._model_to_dict(inst) for inst in instances]
 
     async def count(self) -> int:
         """Подсчет общего количества записей"""
-        async with UnitOfWork(self.session_factory) as uow:
+        async with self._acquire_uow() as uow:
             repo = self._get_repository(uow)
             return await repo.count()
 
@@ -103,7 +128,7 @@ class BaseService:
         data_list: List[Dict[str, Any]]
     ) -> Tuple[int, int]:
         """Массовое создание записей"""
-        async with UnitOfWork(self.session_factory) as uow:
+        async with self._acquire_uow() as uow:
             repo = self._get_repository(uow)
             return await repo.bulk_create_asteroids(data_list) if hasattr(repo, 'bulk_create_asteroids') else await repo.bulk_create(data_list)
 
@@ -112,13 +137,13 @@ class BaseService:
         filters: Dict[str, Any]
     ) -> int:
         """Массовое удаление записей по фильтру"""
-        async with UnitOfWork(self.session_factory) as uow:
+        async with self._acquire_uow() as uow:
             repo = self._get_repository(uow)
             return await repo.bulk_delete(filters)
 
     async def get_statistics(self) -> Dict[str, Any]:
         """Получение статистики для текущей модели"""
-        async with UnitOfWork(self.session_factory) as uow:
+        async with self._acquire_uow() as uow:
             repo = self._get_repository(uow)
             if hasattr(repo, 'get_statistics'):
                 return await repo.get_statistics()
@@ -129,6 +154,16 @@ class BaseService:
                     "model_type": self.model_class.__name__
                 }
 
+    @asynccontextmanager
+    async def _acquire_uow(self):
+        """UnitOfWork текущего запроса, если он открыт, иначе новый"""
+        uow = get_current_uow()
+        if uow is not None:
+            yield uow
+        else:
+            async with UnitOfWork(self.session_factory) as uow:
+                yield uow
+
     def _get_repository(self, uow):
         """Получение нужного репозитория из UnitOfWork"""
         if self.model_class.__name__ == "AsteroidModel":
@@ -38,45 +38,38 @@ class UpdateService:
 
             nasa_designations = [a.get('designation') for a in asteroids_data if a.get('designation')]
 
-            count = 0
+            # Ключ - designation: повтор одного астероида в пачке ON CONFLICT не допускает
+            asteroids_to_save = {}
             for asteroid in asteroids_data:
-                try:
-                    designation = asteroid.get('designation')
-                    if not designation:
-                        logger.warning("Пропуск астероида без designation")
-                        continue
-
-                    data = {
-                        'designation': designation,
-                        'name': asteroid.get('name') or None,
-                        'perihelion_au': self._safe_float_conversion(asteroid.get('perihelion_au')),
-                        'aphelion_au': self._safe_float_conversion(asteroid.get('aphelion_au')),
-                        'earth_moid_au': self._safe_float_conversion(asteroid.get('earth_moid_au')),
-                        'absolute_magnitude': self._safe_float_conversion(
-                            asteroid.get('absolute_magnitude'), default=18.0
-                        ),
-                        'estimated_diameter_km': self._safe_float_conversion(
-                            asteroid.get('estimated_diameter_km'), default=0.0
-                        ),
-                        'accurate_diameter': bool(asteroid.get('accurate_diameter', False)),
-                        'albedo': self._safe_float_conversion(asteroid.get('albedo'), default=0.15),
-                        'orbit_class': asteroid.get('orbit_class') or 'Unknown',
-                        'orbit_id': asteroid.get('orbit_id') or None,
-                        'diameter_source': asteroid.get('diameter_source') or 'calculated'
-                    }
-
-                    existing = await self.asteroid_service.get_by_designation(designation)
-                    if existing:
-                        await self.asteroid_service.update(existing['id'], data)
-                    else:
-                        await self.asteroid_service.create(data)
-
-                    count += 1
-
-                except Exception as e:
-                    logger.error(f"Ошибка обработки астероида {designation}: {e}")
+                designation = asteroid.get('designation')
+                if not designation:
+                    logger.warning("Пропуск астероида без designation")
                     continue
 
+                # Неизвестные орбитальные параметры сохраняются как NULL: 0.0 нарушил бы ограничения таблицы
+                asteroids_to_save[designation] = {
+                    'designation': designation,
+                    'name': asteroid.get('name') or None,
+                    'perihelion_au': self._safe_float_conversion(asteroid.get('perihelion_au'), default=None),
+                    'aphelion_au': self._safe_float_conversion(asteroid.get('aphelion_au'), default=None),
+                    'earth_moid_au': self._safe_float_conversion(asteroid.get('earth_moid_au'), default=None),
+                    'absolute_magnitude': self._safe_float_conversion(
+                        asteroid.get('absolute_magnitude'), default=18.0
+                    ),
+                    'estimated_diameter_km': self._safe_float_conversion(
+                        asteroid.get('estimated_diameter_km'), default=0.0
+                    ),
+                    'accurate_diameter': bool(asteroid.get('accurate_diameter', False)),
+                    'albedo': self._safe_float_conversion(asteroid.get('albedo'), default=0.15),
+                    'orbit_class': asteroid.get('orbit_class') or 'Unknown',
+                    'orbit_id': asteroid.get('orbit_id') or None,
+                    'diameter_source': asteroid.get('diameter_source') or 'calculated'
+                }
+
+            count = 0
+            if asteroids_to_save:
+                count, _ = await self.asteroid_service.bulk_create_asteroids(list(asteroids_to_save.values()))
+
             if nasa_designations:
                 deleted = await self.asteroid_service.delete_asteroids_not_in_designations(nasa_designations)
                 if deleted > 0:
@@ -117,8 +110,9 @@ class UpdateService:
                 return 0
 
             asteroid_dict = {a['designation']: a for a in asteroids_dicts if a.get('designation')}
-            count = 0
 
+            # Ключ - (asteroid_id, approach_time), как у уникального ограничения таблицы
+            approaches_to_save = {}
             for approach in approaches_data:
                 designation = approach.get('asteroid_designation')
                 if not designation:
@@ -128,16 +122,12 @@ class UpdateService:
                     continue
 
                 approach['asteroid_id'] = asteroid['id']
+                approaches_to_save[(asteroid['id'], approach['approach_time'])] = approach
 
-                existing = await self.approach_service.filter(
-                    filters={'asteroid_id': asteroid['id'], 'approach_time': approach['approach_time']},
-                    limit=1
-                )
-                if existing:
-                    await self.approach_service.update(existing[0]['id'], approach)
-                else:
-                    await self.approach_service.create(approach)
-                count += 1
+            count = 0
+            if approaches_to_save:
+                batch_id = f"cad_{datetime.now():%Y%m%d_%H%M%S}"
+                count = await self.approach_service.bulk_create_approaches(list(approaches_to_save.values()), batch_id)
 
             # Удаляем только прошлые сближения (старше текущей даты)
             cutoff_date = datetime.now()
@@ -168,6 +158,7 @@ class UpdateService:
                     await uow.session.commit()
                     deleted = result.rowcount
 
+                ThreatService.invalidate_cache()
                 if deleted > 0:
                     logger.info(f"Удалено {deleted} угроз (нет данных от NASA)")
                 return 0
@@ -177,30 +168,19 @@ class UpdateService:
 
             nasa_designations = [t.get('designation') for t in threats_data if t.get('designation')]
 
-            count = 0
+            # Угрозы известных астероидов записываются пачкой через UPSERT вместо запроса на каждую
+            # Ключ - asteroid_id: повтор одного астероида в пачке ON CONFLICT не допускает
+            threats_to_save = {}
             for threat in threats_data:
-                try:
-                    designation = threat.get('designation')
-                    if not designation:
-                        continue
-
-                    asteroid = asteroid_dict.get(designation)
-                    if not asteroid:
-                        continue
-
-                    threat['asteroid_id'] = asteroid['id']
-
-                    existing = await self.threat_service.get_by_designation(designation)
-                    if existing:
-                        await self.threat_service.update(existing['id'], threat)
-                    else:
-                        await self.threat_service.create(threat)
-
-                    count += 1
-
-                except Exception as e:
-                    logger.error(f"Ошибка обработки угрозы для {designation}: {e}")
+                asteroid = asteroid_dict.get(threat.get('designation'))
+                if not asteroid:
                     continue
+                threat['asteroid_id'] = asteroid['id']
+                threats_to_save[asteroid['id']] = threat
+
+            count = 0
+            if threats_to_save:
+                count, _ = await self.threat_service.bulk_create_threats(list(threats_to_save.values()))
 
             # Удаляем угрозы которых нет в текущем списке NASA
             if nasa_designations:
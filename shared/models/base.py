@@ -1,8 +1,12 @@
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, declared_attr
-from sqlalchemy import DateTime, func
+from sqlalchemy import DateTime, func, inspect
 import re
 
+# Шаблоны преобразования CamelCase в snake_case компилируются один раз
+_LOWER_UPPER_RE = re.compile(r'([a-z0-9])([A-Z])')
+_ACRONYM_RE = re.compile(r'([A-Z])([A-Z][a-z])')
+
 class Base(AsyncAttrs, DeclarativeBase):
     """
     Базовый класс для всех моделей SQLAlchemy.
@@ -18,8 +22,8 @@ class Base(AsyncAttrs, DeclarativeBase):
         
         # Улучшенная логика преобразования CamelCase в snake_case
         # Обрабатываем аббревиатуры правильно
-        name = re.sub(r'([a-z0-9])([A-Z])', r'\1_\2', name)
-        name = re.sub(r'([A-Z])([A-Z][a-z])', r'\1_\2', name)
+        name = _LOWER_UPPER_RE.sub(r'\1_\2', name)
+        name = _ACRONYM_RE.sub(r'\1_\2', name)
         name = name.lower()
         
         # Преобразование в множественное число
@@ -52,10 +56,16 @@ class Base(AsyncAttrs, DeclarativeBase):
     
     def __repr__(self) -> str:
         """Строковое представление объекта для отладки"""
+        # Только загруженные колонки: связи и отложенные поля не попадают в строку и не вызывают загрузку
+        state = inspect(self)
+        unloaded = state.unloaded
         attrs = []
-        for key, value in self.__dict__.items():
-            if not key.startswith('_'):                
-                if isinstance(value, str) and len(value) > 20: # Ограничиваем длину строковых значений для читаемости
-                    value = value[:17] + '...'
-                attrs.append(f"{key}={value!r}")
+        for column_attr in state.mapper.column_attrs:
+            key = column_attr.key
+            if key in unloaded:
+                continue
+            value = state.dict.get(key)
+            if isinstance(value, str) and len(value) > 20: # Ограничиваем длину строковых значений для читаемости
+                value = value[:17] + '...'
+            attrs.append(f"{key}={value!r}")
         return f"{self.__class__.__name__}({', '.join(attrs)})"
\ No newline at end of file
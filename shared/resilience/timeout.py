@@ -24,7 +24,7 @@ def timeout(seconds: float):
 
 # Default timeouts for different NASA API endpoints
 NASA_API_TIMEOUTS = {
-    'sbdb': 30.0,      # SBDB API timeout
+    'sbdb_bulk': 120.0,  # SBDB query API timeout (all PHA in one request)
     'cad': 60.0,       # CAD API timeout
     'sentry': 120.0,   # Sentry API timeout (longer for complex calculations)
     'default': 45.0    # Default timeout
@@ -35,7 +35,7 @@ def update_nasa_api_timeouts_from_values(nasa_api_config):
     """Update NASA API timeouts from provided configuration values"""
     global NASA_API_TIMEOUTS
     NASA_API_TIMEOUTS = {
-        'sbdb': nasa_api_config.sbdb_timeout,
+        'sbdb_bulk': nasa_api_config.sbdb_bulk_timeout,
         'cad': nasa_api_config.cad_timeout,
         'sentry': nasa_api_config.sentry_timeout,
         'default': nasa_api_config.timeout
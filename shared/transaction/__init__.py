@@ -1,4 +1,4 @@
 """
 Transaction management package.
 """
-from .uow import UnitOfWork, AbstractRepository
+from .uow import UnitOfWork, AbstractRepository, get_current_uow, request_scope
@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from typing import Dict, Type, Any, Optional
 import logging
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
@@ -115,4 +117,24 @@ class UnitOfWork:
                 await self._session.close()
             self._session = None
             self._clear_repositories()
-            
\ No newline at end of file
+            
+
+
+# UnitOfWork, открытый на весь HTTP-запрос (см. request_scope)
+_current_uow: ContextVar[Optional[UnitOfWork]] = ContextVar("current_uow", default=None)
+
+
+def get_current_uow() -> Optional[UnitOfWork]:
+    """Возвращает UnitOfWork текущего запроса, если он открыт"""
+    return _current_uow.get()
+
+
+@asynccontextmanager
+async def request_scope(session_factory: async_sessionmaker[AsyncSession]):
+    """Открывает один UnitOfWork, который разделяют все вызовы сервисов внутри запроса"""
+    async with UnitOfWork(session_factory) as uow:
+        token = _current_uow.set(uow)
+        try:
+            yield uow
+        finally:
+            _current_uow.reset(token)
@@ -1,3 +1,5 @@
 from .get_date import GetDate
 from .space_math import get_size_by_h_mag, get_size_by_albedo
+from .torino import THREAT_LEVEL_BY_TORINO
+from .cache import async_ttl_cache
 from .error_handlers import *
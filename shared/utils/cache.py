@@ -0,0 +1,101 @@
+import asyncio
+import copy
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class _OwnerCancelled(Exception):
+    """Вызов-владелец отменён; ожидающие повторяют запрос сами, а не получают чужую отмену"""
+
+
+def _make_key(args: tuple, kwargs: dict) -> Hashable:
+    """Ключ кеша из аргументов вызова (без self)"""
+    return args[1:], tuple(sorted(kwargs.items()))
+
+
+def async_ttl_cache(ttl: float = 60.0, maxsize: int = 1024):
+    """Декоратор TTL-кеша для асинхронных методов.
+
+    Кеш хранится на уровне декоратора, а не экземпляра,
+    так как сервисы создаются заново на каждый запрос.
+    Размер ограничен maxsize записями (вытесняются давно не читавшиеся),
+    просроченные записи удаляются при чтении и записи.
+    Одновременные промахи по одному ключу объединяются в один вызов.
+    Каждый вызывающий получает свою копию значения, чтобы изменения
+    результата не портили кеш для остальных.
+    """
+    def decorator(func: Callable):
+        cache: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        inflight: Dict[Hashable, asyncio.Future] = {}
+        # Увеличивается при cache_clear: результат, начатый до сброса, не сохраняется
+        generation = 0
+
+        def store(key: Hashable, value: Any) -> None:
+            now = time.monotonic()
+            cache[key] = (now + ttl, copy.deepcopy(value))
+            cache.move_to_end(key)
+            # В начале - давно не читавшиеся записи: сначала просроченные, затем сверх maxsize
+            while cache:
+                oldest_key, (expires_at, _) = next(iter(cache.items()))
+                if expires_at > now and len(cache) <= maxsize:
+                    break
+                del cache[oldest_key]
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = _make_key(args, kwargs)
+
+            while True:
+                entry = cache.get(key)
+                if entry is not None:
+                    if entry[0] > time.monotonic():
+                        cache.move_to_end(key)
+                        return copy.deepcopy(entry[1])
+                    del cache[key]
+
+                # Запрос по этому ключу уже выполняется - ждём его результат
+                future = inflight.get(key)
+                if future is None:
+                    break
+                try:
+                    return copy.deepcopy(await asyncio.shield(future))
+                except _OwnerCancelled:
+                    # Владелец отменён (например, клиент отключился) - первый ожидающий становится новым владельцем
+                    continue
+
+            future = asyncio.get_running_loop().create_future()
+            inflight[key] = future
+            started_generation = generation
+            try:
+                result = await func(*args, **kwargs)
+            except asyncio.CancelledError:
+                future.set_exception(_OwnerCancelled())
+                future.exception()
+                raise
+            except Exception as e:
+                future.set_exception(e)
+                # Исключение уже получает вызывающий; у ожидающих его может не быть
+                future.exception()
+                raise
+            else:
+                if started_generation == generation:
+                    store(key, result)
+                future.set_result(result)
+                return result
+            finally:
+                # После cache_clear по ключу мог начаться новый вызов - его не трогаем
+                if inflight.get(key) is future:
+                    del inflight[key]
+
+        def cache_clear():
+            """Сбрасывает кеш; уже выполняющиеся вызовы не сохранят результат"""
+            nonlocal generation
+            generation += 1
+            cache.clear()
+            inflight.clear()
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
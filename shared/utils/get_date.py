@@ -5,6 +5,12 @@ import re
 
 logger = logging.getLogger(__name__)
 
+_YEAR_RE = re.compile(r'\d{4}')
+_NUMERIC_MONTH_RE = re.compile(r'-(\d{1,2})-')
+_DAY_RE = re.compile(r'-(\d{1,2})\s')
+_DAY_AT_END_RE = re.compile(r'-(\d{1,2})$')
+_TIME_RE = re.compile(r'(\d{1,2}):(\d{1,2})')
+
 
 class GetDate:
     def _parse_cad_date_exact(self, cd_str: str) -> datetime:
@@ -83,7 +89,7 @@ class GetDate:
         try:
             clean_str = ' '.join(cd_str.split())
 
-            year_match = re.search(r'\d{4}', clean_str)
+            year_match = _YEAR_RE.search(clean_str)
             if not year_match:
                 raise ValueError(f"Не найден год в строке: {cd_str}")
 
@@ -101,22 +107,22 @@ class GetDate:
                     break
 
             if month is None:
-                month_match = re.search(r'-(\d{1,2})-', clean_str)
+                month_match = _NUMERIC_MONTH_RE.search(clean_str)
                 if month_match:
                     month = int(month_match.group(1))
                 else:
                     raise ValueError(f"Не найден месяц в строке: {cd_str}")
 
-            day_match = re.search(r'-(\d{1,2})\s', clean_str)
+            day_match = _DAY_RE.search(clean_str)
             if not day_match:
-                day_match = re.search(r'-(\d{1,2})$', clean_str)
+                day_match = _DAY_AT_END_RE.search(clean_str)
 
             if not day_match:
                 raise ValueError(f"Не найден день в строке: {cd_str}")
 
             day = int(day_match.group(1))
 
-            time_match = re.search(r'(\d{1,2}):(\d{1,2})', clean_str)
+            time_match = _TIME_RE.search(clean_str)
             if time_match:
                 hour = int(time_match.group(1))
                 minute = int(time_match.group(2))
@@ -1,6 +1,12 @@
+import math
+
+# 10 ** (-0.2 * h) == exp(_NEG_02_LN10 * h)
+_NEG_02_LN10 = -0.2 * math.log(10)
+
+
 def get_size_by_albedo(albedo: float, h_mag: float) -> float:
     """Рассчитывает диаметр астероида в км по альбедо и абсолютной звездной величине"""
-    return 1329 / (albedo ** 0.5) * (10 ** (-0.2 * h_mag))
+    return 1329 / math.sqrt(albedo) * math.exp(_NEG_02_LN10 * h_mag)
 
 
 def get_size_by_h_mag(h_mag: float) -> float:
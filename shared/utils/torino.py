@@ -0,0 +1,11 @@
+# Уровень угрозы по Туринской шкале 1..7 (индекс - значение шкалы); 0 зависит от шкалы Палермо, 8 и выше - критический
+THREAT_LEVEL_BY_TORINO = (
+    None,
+    "НИЗКИЙ (требует наблюдения)",
+    "НИЗКИЙ (требует наблюдения)",
+    "НИЗКИЙ (требует наблюдения)",
+    "НИЗКИЙ (требует наблюдения)",
+    "СРЕДНИЙ (заслуживает внимания астрономов)",
+    "ПОВЫШЕННЫЙ (серьёзная угроза)",
+    "ВЫСОКИЙ (очень серьёзная угроза)",
+)
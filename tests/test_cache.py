@@ -0,0 +1,154 @@
+import asyncio
+
+import pytest
+
+from shared.utils import cache as cache_module
+from shared.utils.cache import async_ttl_cache
+
+
+class FakeClock:
+    """Подменяет time.monotonic в модуле кеша, чтобы проверять TTL без ожидания"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module.time, "monotonic", fake)
+    return fake
+
+
+class Service:
+    """Сервис с кешируемым методом; release управляет моментом завершения вызова"""
+
+    def __init__(self, ttl: float = 60.0, maxsize: int = 1024):
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+        self.error = None
+
+        @async_ttl_cache(ttl=ttl, maxsize=maxsize)
+        async def get(owner, key):
+            owner.calls += 1
+            await owner.release.wait()
+            if owner.error is not None:
+                raise owner.error
+            return {"key": key, "call": owner.calls}
+
+        self._get = get
+
+    async def get(self, key):
+        return await self._get(self, key)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_are_coalesced():
+    service = Service()
+    service.release.clear()
+
+    tasks = [asyncio.create_task(service.get("a")) for _ in range(5)]
+    await asyncio.sleep(0)
+    service.release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert service.calls == 1
+    assert all(result == {"key": "a", "call": 1} for result in results)
+
+
+@pytest.mark.asyncio
+async def test_callers_get_independent_copies():
+    service = Service()
+
+    first = await service.get("a")
+    first["key"] = "mutated"
+
+    assert await service.get("a") == {"key": "a", "call": 1}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_owner_does_not_cancel_waiters():
+    service = Service()
+    service.release.clear()
+
+    owner = asyncio.create_task(service.get("a"))
+    await asyncio.sleep(0)
+    waiters = [asyncio.create_task(service.get("a")) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    owner.cancel()
+    await asyncio.sleep(0)
+    service.release.set()
+    results = await asyncio.gather(*waiters)
+
+    with pytest.raises(asyncio.CancelledError):
+        await owner
+    # Один из ожидающих стал новым владельцем, второй получил его результат
+    assert service.calls == 2
+    assert results[0] == results[1] == {"key": "a", "call": 2}
+
+
+@pytest.mark.asyncio
+async def test_exception_propagates_to_waiters_and_is_not_cached():
+    service = Service()
+    service.release.clear()
+    service.error = RuntimeError("boom")
+
+    tasks = [asyncio.create_task(service.get("a")) for _ in range(3)]
+    await asyncio.sleep(0)
+    service.release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert service.calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    service.error = None
+    assert await service.get("a") == {"key": "a", "call": 2}
+
+
+@pytest.mark.asyncio
+async def test_entry_expires_after_ttl(clock):
+    service = Service(ttl=10)
+
+    await service.get("a")
+    clock.now += 9
+    await service.get("a")
+    assert service.calls == 1
+
+    clock.now += 2
+    assert await service.get("a") == {"key": "a", "call": 2}
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_entry_is_evicted():
+    service = Service(maxsize=2)
+
+    await service.get("a")
+    await service.get("b")
+    await service.get("a")  # "b" становится давно не читавшейся записью
+    await service.get("c")
+    assert service.calls == 3
+
+    await service.get("a")
+    assert service.calls == 3
+    await service.get("b")
+    assert service.calls == 4
+
+
+@pytest.mark.asyncio
+async def test_cache_clear_discards_result_of_call_in_flight():
+    service = Service()
+    service.release.clear()
+
+    task = asyncio.create_task(service.get("a"))
+    await asyncio.sleep(0)
+    service._get.cache_clear()
+    service.release.set()
+    await task
+
+    await service.get("a")
+    assert service.calls == 2